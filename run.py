@@ -6,7 +6,6 @@
 - 4단계 프로세스: 목록화 -> 세부정보 수집 -> 다운로드 -> 업로드
 """
 
-import asyncio
 import sys
 import os
 
@@ -29,13 +28,19 @@ def show_usage():
 검색 옵션:
     python run.py -k "전북특별자치도"       # 검색 키워드 지정
     python run.py -p 5                     # 최대 5페이지까지 검색 (0: 모든 페이지)
+    python run.py --search-param KEY=VALUE # 서버 측 검색 필터 파라미터 추가
     
 처리 옵션:
     python run.py -n 10                    # 최대 10개 항목 처리 (0: 모든 항목)
     python run.py --data-ids 15014782      # 특정 데이터 ID만 처리
+    python run.py --rate 5                 # 초당 최대 5개 요청으로 제한
+    python run.py --max-concurrency 4      # 단계별 동시 요청을 최대 4개로 제한
+    python run.py --force-download         # 이미 다운로드된 항목도 다시 다운로드
+    python run.py --refresh                # 최근 결과를 재사용하지 않고 목록/세부정보 다시 수집
     
 파일 옵션:
     python run.py --list-file custom.json  # 목록 파일 지정
+    python run.py --format ndjson          # 목록/세부정보를 줄 단위 JSON으로 이어 쓰기
     python run.py --filtered-file filt.json # 필터링된 데이터 파일 지정
     
 업로드 옵션:
@@ -54,8 +59,8 @@ if __name__ == "__main__":
     
     # 모듈 import는 여기서 수행 (초기 도움말 표시를 빠르게 하기 위함)
     try:
-        from src.main import main
-        asyncio.run(main())
+        from src.main import run
+        run()
     except KeyboardInterrupt:
         print("\n\n프로그램이 사용자에 의해 중단되었습니다.")
         sys.exit(1)
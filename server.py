@@ -5,12 +5,16 @@
 - localhost:11311에서 실행
 - /api/upload 엔드포인트를 통해 파일, description, auto_description 필드를 처리
 - 파일을 실제로 저장하지 않고 로그만 출력
+- aiohttp 비동기 서버로 여러 업로드 요청을 동시에 처리
 """
 
-from flask import Flask, request, jsonify
+from aiohttp import web
+import codecs
 import os
 import logging
 import time
+import orjson
+from itertools import islice
 
 # 로깅 설정
 logging.basicConfig(
@@ -19,10 +23,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+routes = web.RouteTableDef()
 
-@app.route('/api/upload', methods=['POST'])
-def upload_file():
+# 파일 유형(텍스트/바이너리) 추정에 사용할 앞부분 크기 (바이트)
+SNIFF_SIZE = 512
+
+# 로그에 먼저 표시할 메타데이터 주요 필드
+IMPORTANT_FIELDS = ('title', 'data_id', 'file_format', 'description')
+IMPORTANT_FIELD_SET = frozenset(IMPORTANT_FIELDS)
+# 로그에 표시할 기타 필드 최대 개수
+MAX_OTHER_FIELDS = 10
+# 업로드 요청 본문 최대 크기 (aiohttp 기본값 1MB는 데이터 파일에 부족함)
+MAX_UPLOAD_SIZE = 1024 ** 3
+
+@routes.post('/api/upload')
+async def upload_file(request):
     """
     파일 업로드 처리 엔드포인트
     
@@ -31,20 +46,28 @@ def upload_file():
     - description: 파일 설명
     - auto_description: 메타데이터 전체 (JSON 문자열)
     """
+    # 멀티파트 폼 읽기 (업로드 파일은 임시 파일에 저장됨)
+    form = await request.post()
+    
     # 요청 확인
-    if 'file' not in request.files:
+    upload = form.get('file')
+    if not isinstance(upload, web.FileField):
         logger.error("파일이 요청에 없습니다.")
-        return jsonify({"error": "파일이 요청에 없습니다."}), 400
+        return web.json_response({"error": "파일이 요청에 없습니다."}, status=400)
     
-    # 파일 정보 추출
-    file = request.files['file']
-    filename = file.filename
-    file_size = len(file.read())
-    file.seek(0)  # 파일 포인터 초기화
+    # 파일 정보 추출 (임시 파일은 크기와 앞부분만 확인한 뒤 바로 닫음)
+    filename = upload.filename
+    with upload.file as file:
+        # 파일 전체를 메모리에 읽지 않고 끝으로 이동하여 크기 계산
+        file.seek(0, os.SEEK_END)
+        file_size = file.tell()
+        file.seek(0)  # 파일 포인터 초기화
+        # 파일 유형 판단용 앞부분
+        file_content_preview = file.read(SNIFF_SIZE)
     
     # 설명 필드 가져오기
-    description = request.form.get('description', '')
-    auto_description = request.form.get('auto_description', '')
+    description = form.get('description', '')
+    auto_description = form.get('auto_description', '')
     
     # 로그에 정보 출력
     logger.info(f"===== 파일 업로드 요청 =====")
@@ -55,12 +78,10 @@ def upload_file():
     # auto_description 출력 (JSON 형식이면 파싱)
     logger.info(f"메타데이터 길이: {len(auto_description)} 문자")
     try:
-        import json
-        auto_desc_json = json.loads(auto_description)
+        auto_desc_json = orjson.loads(auto_description)
         # 주요 필드만 추출해서 표시
-        important_fields = ['title', 'data_id', 'file_format', 'description']
         logger.info("===== 메타데이터 주요 내용 =====")
-        for field in important_fields:
+        for field in IMPORTANT_FIELDS:
             if field in auto_desc_json:
                 value = auto_desc_json[field]
                 # 긴 값은 잘라서 표시
@@ -70,15 +91,16 @@ def upload_file():
         
         # 추가 필드가 있으면 표시
         logger.info("===== 메타데이터 기타 필드 =====")
-        other_fields = [k for k in auto_desc_json.keys() if k not in important_fields]
-        for i, field in enumerate(other_fields):
-            if i >= 10:  # 최대 10개 필드만 표시
-                logger.info(f"  ... 외 {len(other_fields) - 10}개 필드")
-                break
+        # 최대 MAX_OTHER_FIELDS개 필드만 표시 (원래 순서 유지, 나머지는 개수만 계산)
+        other_count = len(auto_desc_json.keys() - IMPORTANT_FIELD_SET)
+        other_fields = (k for k in auto_desc_json if k not in IMPORTANT_FIELD_SET)
+        for field in islice(other_fields, MAX_OTHER_FIELDS):
             value = auto_desc_json[field]
             if isinstance(value, str) and len(value) > 50:
                 value = value[:50] + "..."
             logger.info(f"  {field}: {value}")
+        if other_count > MAX_OTHER_FIELDS:
+            logger.info(f"  ... 외 {other_count - MAX_OTHER_FIELDS}개 필드")
         
     except Exception as e:
         # JSON 파싱 실패시 일부만 출력
@@ -86,7 +108,6 @@ def upload_file():
         logger.info(auto_description[:200] + ('...' if len(auto_description) > 200 else ''))
     
     # 필요시 파일 내용 일부 로깅
-    file_content_preview = file.read(100)
     file_type = "텍스트" if is_text(file_content_preview) else "바이너리"
     logger.info(f"파일 유형: {file_type}")
     
@@ -102,18 +123,21 @@ def upload_file():
         "message": "파일 업로드가 성공적으로 처리되었습니다."
     }
     
-    return jsonify(response_data), 200
+    return web.json_response(response_data)
 
 def is_text(byte_data):
-    """데이터가 텍스트인지 바이너리인지 추정"""
+    """데이터가 텍스트인지 바이너리인지 추정 (앞부분만 주어지므로 끝에서 잘린 멀티바이트 문자는 허용)"""
     try:
-        byte_data.decode('utf-8')
+        codecs.getincrementaldecoder('utf-8')().decode(byte_data, final=False)
         return True
     except UnicodeDecodeError:
         return False
 
+app = web.Application(client_max_size=MAX_UPLOAD_SIZE)
+app.add_routes(routes)
+
 if __name__ == '__main__':
     logger.info("=== 파일 업로드 서버 시작 ===")
     logger.info("주소: http://localhost:11311")
     logger.info("엔드포인트: /api/upload")
-    app.run(host='0.0.0.0', port=11311, debug=True) 
\ No newline at end of file
+    web.run_app(app, host='0.0.0.0', port=11311, print=None) 
\ No newline at end of file
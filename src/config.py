@@ -9,6 +9,9 @@ LIST_URL = "https://www.data.go.kr/tcs/dss/selectDataSetList.do"
 # 디렉토리 설정
 DOWNLOAD_BASE_DIR = "downloaded_data"  # 다운로드 기본 디렉토리
 
+# 다운로드 설정
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 파일 스트리밍 청크 크기 (바이트)
+
 # 로그 설정
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR, CRITICAL
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
@@ -31,6 +34,16 @@ EXT_MAP = {
     'SHP': 'zip'  # SHP 파일은 보통 ZIP으로 압축되어 제공됨
 }
 
+# 동시성 설정
+LIST_CONCURRENCY = 8  # 목록 페이지 동시 요청 수
+DETAIL_CONCURRENCY = 10  # 세부 페이지 동시 요청 수
+DOWNLOAD_CONCURRENCY = 4  # 파일 동시 다운로드 수
+UPLOAD_CONCURRENCY = 3  # 파일 동시 업로드 수
+REQUEST_RATE = 10  # 초당 최대 요청 수 (토큰 버킷)
+
+# 결과 재사용 설정
+STAGE_CACHE_TTL = 60 * 60  # 같은 조건으로 다시 실행할 때 목록/세부정보 결과를 재사용하는 시간 (초, 0이면 재사용 안 함)
+
 # 진행률 표시 설정
 PROGRESS_BAR_WIDTH = 50  # 진행률 바 너비
 
@@ -39,9 +52,25 @@ REQUIRED_TITLE_KEYWORDS = ['전북', '전라북도', '전북특별자치도']  #
 
 # HTTP 요청 설정
 REQUEST_HEADERS = {
+    # Accept-Encoding은 지정하지 않음 (aiohttp가 gzip/deflate를 기본 요청하고, Brotli를 불러올 수 있을 때만 br 추가)
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
+# HTTP 연결 설정 (aiohttp TCPConnector)
+HTTP_CONNECTOR = {
+    "limit": 100,  # 전체 동시 연결 수
+    "limit_per_host": 20,  # 호스트별 동시 연결 수
+    "keepalive_timeout": 75,  # 유휴 연결 유지 시간 (초)
+    "ttl_dns_cache": 300  # DNS 캐시 유지 시간 (초)
+}
+
+# HTTP 타임아웃 설정 (aiohttp ClientTimeout)
+HTTP_TIMEOUT = {
+    "total": None,  # 전체 타임아웃 없음 (대용량 파일 다운로드 고려)
+    "sock_connect": 10,  # 연결 타임아웃 (초)
+    "sock_read": 60  # 읽기 타임아웃 (초)
+}
+
 # 파일 서버 설정
 FILE_SERVER = {
     "api_url": "http://localhost:11311/api/upload",
@@ -5,17 +5,18 @@
 """
 
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
+import aiofiles
+import io
+import tarfile
+import time
+from lxml import etree, html as lxml_html
 import re
-import json
 import logging
 import os
-import random
 from urllib.parse import urljoin
 
-from .config import BASE_URL, REQUEST_HEADERS, REQUIRED_TITLE_KEYWORDS
-from .utils import print_progress, save_metadata, load_metadata
+from .config import BASE_URL, REQUEST_HEADERS, REQUIRED_TITLE_KEYWORDS, DETAIL_CONCURRENCY
+from .utils import create_session, create_rate_limiter, print_progress, save_metadata, load_metadata, iter_metadata_items, xpath_class, element_text
 
 # 브라우저와 유사한 요청 헤더 추가
 BROWSER_HEADERS = {
@@ -24,6 +25,73 @@ BROWSER_HEADERS = {
     'Accept-Language': 'ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7',
     'Connection': 'keep-alive'
 }
+# 세부 페이지 세션 기본 헤더 (요청마다 병합하지 않고 세션 생성 시 한 번만 적용)
+DETAIL_SESSION_HEADERS = {**REQUEST_HEADERS, **BROWSER_HEADERS}
+
+# 제목/제공기관 필수 키워드 정규식 (키워드 중 하나라도 포함되는지 한 번의 검색으로 확인)
+_TITLE_KEYWORD_RE = re.compile('|'.join(map(re.escape, REQUIRED_TITLE_KEYWORDS)))
+
+# 다운로드 버튼 onclick의 작은따옴표 인자 정규식
+_ONCLICK_ARGS_RE = re.compile(r"'([^']*)'")
+
+# 메타데이터 테이블 헤더 -> 데이터 항목 필드 매핑 (공백을 제거한 헤더 텍스트에 포함 여부로 판단, 앞쪽 항목 우선)
+_DETAIL_HEADER_FIELDS = {
+    '파일데이터명': 'file_data_name',
+    '분류체계': 'category',
+    '제공기관': 'provider',
+    '관리부서명': 'department',
+    '관리부서전화번호': 'contact_phone',
+    '수집방법': 'collection_method',
+    '업데이트주기': 'update_cycle',
+    '차기등록예정일': 'next_update_date',
+    '확장자': 'extension',
+    '키워드': 'keywords',
+    '등록일': 'register_date',
+    '수정일': 'update_date',
+    '제공형태': 'provision_type',
+    '설명': 'description',
+    '기타유의사항': 'note',
+    '이용허락범위': 'license',
+}
+# 헤더 텍스트 공백 제거용 변환 테이블 (공백, 탭, 줄바꿈, &nbsp;를 한 번에 삭제)
+_HEADER_WS_TABLE = str.maketrans('', '', ' \t\n\r\xa0')
+
+# 헤더 셀 텍스트 추출
+def _header_text(cell):
+    """헤더 셀의 텍스트를 모든 공백을 제거한 형태로 반환하는 함수"""
+    return cell.text_content().translate(_HEADER_WS_TABLE)
+# 헤더 라벨 튜플 (str.startswith의 튜플 인자로 한 번에 접두어 검사)
+_DETAIL_HEADER_LABELS = tuple(_DETAIL_HEADER_FIELDS)
+# 헤더 텍스트별 필드 조회 결과 캐시 (페이지마다 같은 헤더가 반복됨)
+_header_field_cache = {}
+
+# 헤더 텍스트에 대응하는 필드 찾기
+def _header_field(header_text):
+    """메타데이터 테이블 헤더 텍스트에 해당하는 필드명을 반환하는 함수 (없으면 None)
+    
+    대부분의 헤더는 라벨로 시작하므로 접두어 검사를 먼저 하고, 맞지 않을 때만 포함 여부로 찾습니다.
+    """
+    if header_text not in _header_field_cache:
+        if header_text.startswith(_DETAIL_HEADER_LABELS):
+            labels = (label for label in _DETAIL_HEADER_LABELS if header_text.startswith(label))
+        else:
+            labels = (label for label in _DETAIL_HEADER_LABELS if label in header_text)
+        label = next(labels, None)
+        _header_field_cache[header_text] = _DETAIL_HEADER_FIELDS.get(label)
+    return _header_field_cache[header_text]
+
+# 세부 페이지를 파서에 넘기는 청크 크기 (바이트)
+_DETAIL_CHUNK_SIZE = 16 * 1024
+
+# 세부 페이지 XPath (모듈 로드 시 한 번만 컴파일)
+_XP_META_TABLES = etree.XPath(f'//*[{xpath_class("dataset-table")} and {xpath_class("fileDataDetail")}]')
+_XP_ALL_TABLES = etree.XPath('//table')
+_XP_ROWS = etree.XPath('.//tr')
+_XP_HEADER_CELLS = etree.XPath('.//th')
+_XP_VALUE_CELLS = etree.XPath('.//td')
+_XP_FIRST_LINK = etree.XPath('(.//a)[1]')
+# '다운로드' 텍스트를 포함한 링크/버튼만 선택 (모든 링크를 파이썬에서 순회하지 않도록 XPath에서 거름)
+_XP_DOWNLOAD_BUTTONS = etree.XPath("//a[contains(., '다운로드')] | //button[contains(., '다운로드')]")
 
 # 디버그 설정 (모듈 변수)
 _DEBUG_ENABLED = False
@@ -69,6 +137,7 @@ def get_debug_settings():
 
 # 지원하는 파일 확장자 목록
 SUPPORTED_EXTENSIONS = ['CSV', 'XLSX', 'DOCX', 'HWPX', 'PDF', 'XLS', 'HWP']
+_SUPPORTED_EXTENSION_SET = frozenset(SUPPORTED_EXTENSIONS)  # 형식 필터링용 집합
 
 # 목록 데이터 로드
 def load_list_data(list_file="data_list.json"):
@@ -81,69 +150,110 @@ def load_list_data(list_file="data_list.json"):
     logging.info(f"목록 데이터 파일에서 {len(data)}개 항목을 로드했습니다.")
     return data
 
+# 제목 또는 제공기관 키워드 검사
+def _matches_title_or_provider(item):
+    """제목이나 제공기관에 필요한 키워드가 포함되어 있는지 확인하는 함수"""
+    # 키워드 확인 (전북, 전라북도, 전북특별자치도 중 하나 포함)
+    # 목록에서 제공기관을 찾지 못하면 None으로 저장됨
+    return bool(_TITLE_KEYWORD_RE.search(item.get('title') or '') or _TITLE_KEYWORD_RE.search(item.get('provider') or ''))
+
+# 파일 형식 검사
+def _matches_format(item):
+    """지원되는 파일 형식인지 확인하는 함수 (형식이 명시되지 않은 경우 세부 페이지에서 확인하도록 통과)"""
+    format_types = item.get('format_types')
+    return not format_types or not _SUPPORTED_EXTENSION_SET.isdisjoint(format_types)
+
+# 다운로드 버튼 유무 검사
+def _has_download_button(item):
+    """다운로드 버튼이 있는 항목인지 확인하는 함수"""
+    return bool(item.get('has_download_btn'))
+
 # 제목 또는 제공기관 기반 필터링
 def filter_by_title_or_provider(items):
     """제목이나 제공기관에 필요한 키워드가 포함된 항목만 필터링하는 함수"""
-    filtered_items = []
-    
-    for item in items:
-        title = item.get('title', '')
-        provider = item.get('provider', '')
-        
-        # 키워드 확인 (전북, 전라북도, 전북특별자치도 중 하나 포함)
-        if any(keyword in title for keyword in REQUIRED_TITLE_KEYWORDS) or \
-           any(keyword in provider for keyword in REQUIRED_TITLE_KEYWORDS):
-            filtered_items.append(item)
-        else:
-            logging.debug(f"키워드 필터링: 제외 '{title}' (제공기관: {provider})")
-    
+    filtered_items = [item for item in items if _matches_title_or_provider(item)]
     logging.info(f"제목/제공기관 필터링 결과: {len(filtered_items)}/{len(items)}개 항목 선택")
     return filtered_items
 
 # 파일 형식 기반 필터링
 def filter_by_format(items):
     """지원되는 파일 형식인 항목만 필터링하는 함수"""
-    filtered_items = []
-    
-    for item in items:
-        format_types = item.get('format_types', [])
-        
-        # 형식이 명시되지 않은 경우 일단 포함 (세부 페이지에서 확인)
-        if not format_types:
-            filtered_items.append(item)
-            continue
-        
-        # 지원하는 형식인지 확인
-        if any(ext in SUPPORTED_EXTENSIONS for ext in format_types):
-            filtered_items.append(item)
-        else:
-            logging.debug(f"형식 필터링: 제외 '{item.get('title')}' (형식: {format_types})")
-    
+    filtered_items = [item for item in items if _matches_format(item)]
     logging.info(f"형식 필터링 결과: {len(filtered_items)}/{len(items)}개 항목 선택")
     return filtered_items
 
 # 다운로드 버튼 유무 확인
 def filter_by_download_button(items):
     """다운로드 버튼이 있는 항목만 필터링하는 함수"""
-    filtered_items = []
-    
-    for item in items:
-        if item.get('has_download_btn', False):
-            filtered_items.append(item)
-        else:
+    filtered_items = [item for item in items if _has_download_button(item)]
+    logging.info(f"다운로드 버튼 필터링 결과: {len(filtered_items)}/{len(items)}개 항목 선택")
+    return filtered_items
+
+# 세 가지 필터를 한 번의 순회로 적용
+def _filter_item(item, counts, log_rejects):
+    """제목/제공기관, 파일 형식, 다운로드 버튼 필터를 차례로 적용하고 단계별 통과 수를 counts에 누적하는 함수"""
+    counts['total'] += 1
+    if not _matches_title_or_provider(item):
+        if log_rejects:
+            logging.debug(f"키워드 필터링: 제외 '{item.get('title')}' (제공기관: {item.get('provider')})")
+        return False
+    counts['title'] += 1
+    if not _matches_format(item):
+        if log_rejects:
+            logging.debug(f"형식 필터링: 제외 '{item.get('title')}' (형식: {item.get('format_types')})")
+        return False
+    counts['format'] += 1
+    if not _has_download_button(item):
+        if log_rejects:
             logging.debug(f"다운로드 버튼 필터링: 제외 '{item.get('title')}'")
+        return False
+    counts['passed'] += 1
+    return True
+
+def _new_filter_counts():
+    """필터 단계별 통과 수 집계용 딕셔너리 생성"""
+    return {'total': 0, 'title': 0, 'format': 0, 'passed': 0}
+
+def _log_filter_counts(counts):
+    """필터 단계별 통과 수 로그 출력"""
+    logging.info(f"제목/제공기관 필터링 결과: {counts['title']}/{counts['total']}개 항목 선택")
+    logging.info(f"형식 필터링 결과: {counts['format']}/{counts['title']}개 항목 선택")
+    logging.info(f"다운로드 버튼 필터링 결과: {counts['passed']}/{counts['format']}개 항목 선택")
+
+def filter_items(items):
+    """제목/제공기관, 파일 형식, 다운로드 버튼 필터를 항목마다 차례로 적용하는 함수
     
-    logging.info(f"다운로드 버튼 필터링 결과: {len(filtered_items)}/{len(items)}개 항목 선택")
+    items는 리스트 또는 스트리밍 이터레이터이며, 한 번만 순회하고 통과한 항목만 리스트로 반환합니다.
+    """
+    counts = _new_filter_counts()
+    # 제외 항목 로그는 디버그 레벨일 때만 생성 (항목마다 메시지를 만들지 않도록 한 번만 확인)
+    log_rejects = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
+    filtered_items = [item for item in items if _filter_item(item, counts, log_rejects)]
+    
+    _log_filter_counts(counts)
     return filtered_items
 
+async def _filter_queue_items(item_queue):
+    """큐에 들어오는 항목에 필터를 적용해 통과한 항목을 바로 내주는 비동기 제너레이터 (None을 받으면 종료)"""
+    counts = _new_filter_counts()
+    log_rejects = logging.getLogger().isEnabledFor(logging.DEBUG)
+    
+    while (item := await item_queue.get()) is not None:
+        if _filter_item(item, counts, log_rejects):
+            yield item
+    
+    _log_filter_counts(counts)
+
 # 세부 페이지에서 정보 수집
-async def fetch_detail_page(session, data_item, debug=None):
+async def fetch_detail_page(session, data_item, debug=None, debug_queue=None):
     """세부 페이지에서 추가 정보를 수집하는 함수
     
     Args:
         session: HTTP 세션
         data_item: 데이터 항목
         debug: 디버그 모드 활성화 여부 (None일 경우 전역 설정 사용)
+        debug_queue: 디버그 HTML을 넘길 백그라운드 기록 큐 (None이면 항목별 파일로 직접 저장)
     """
     # 디버그 설정 확인 (None이면 전역 설정 사용)
     use_debug = _DEBUG_ENABLED if debug is None else debug
@@ -154,39 +264,56 @@ async def fetch_detail_page(session, data_item, debug=None):
         return data_item
     
     try:
-        # 브라우저와 유사한 헤더 추가
-        headers = {**REQUEST_HEADERS, **BROWSER_HEADERS}
+        # 브라우저와 유사한 헤더는 세션 기본 헤더로 적용됨 (DETAIL_SESSION_HEADERS)
         logging.info(f"요청 URL: {detail_url}")
         
-        async with session.get(detail_url, headers=headers) as response:
+        async with session.get(detail_url) as response:
             if response.status != 200:
                 logging.error(f"세부 페이지 접근 실패: HTTP {response.status}")
                 return data_item
             
-            html = await response.text(encoding='utf-8')
+            logging.debug(f"응답 Content-Encoding: {response.headers.get('Content-Encoding', '')}")
+            # 수신한 청크를 바로 lxml 증분 파서에 전달 (전체 본문을 버퍼링하지 않고 수신과 파싱을 겹침)
+            # 파서는 청크 사이에 상태를 가지므로 동시 실행되는 요청끼리 공유하지 않고 요청마다 생성
+            parser = lxml_html.HTMLParser(encoding='utf-8')
             
             # 디버깅용: HTML 저장 (디버그 모드일 때만)
-            if use_debug:
-                debug_file = os.path.join(_DEBUG_HTML_DIR, f"debug_{data_item['data_id']}.html")
-                with open(debug_file, "w", encoding="utf-8") as f:
-                    f.write(html)
+            debug_name = f"debug_{data_item['data_id']}.html" if use_debug else None
+            
+            if debug_name and debug_queue is not None:
+                # 기록 태스크가 있으면 본문을 모아 큐에 넘기고 파일 쓰기는 기다리지 않음
+                debug_chunks = []
+                async for chunk in response.content.iter_chunked(_DETAIL_CHUNK_SIZE):
+                    parser.feed(chunk)
+                    debug_chunks.append(chunk)
+                debug_queue.put_nowait((debug_name, b''.join(debug_chunks)))
+            elif debug_name:
+                # 디버그 HTML 쓰기는 aiofiles로 처리하여 이벤트 루프를 막지 않음
+                debug_file = os.path.join(_DEBUG_HTML_DIR, debug_name)
+                async with aiofiles.open(debug_file, "wb") as debug_fp:
+                    async for chunk in response.content.iter_chunked(_DETAIL_CHUNK_SIZE):
+                        parser.feed(chunk)
+                        await debug_fp.write(chunk)
                 logging.info(f"HTML 저장됨: {debug_file}")
+            else:
+                async for chunk in response.content.iter_chunked(_DETAIL_CHUNK_SIZE):
+                    parser.feed(chunk)
             
-            soup = BeautifulSoup(html, 'html.parser')
+            tree = parser.close()
             
             # 데이터 테이블에서 메타데이터 추출 - 디버깅 로그 추가
-            meta_tables = soup.select('.dataset-table.fileDataDetail')
+            meta_tables = _XP_META_TABLES(tree)
             logging.info(f"URL: {detail_url}, 찾은 테이블 수: {len(meta_tables)}")
             
             # 테이블이 없으면 모든 테이블 확인
             if not meta_tables:
-                all_tables = soup.select('table')
+                all_tables = _XP_ALL_TABLES(tree)
                 logging.info(f"모든 테이블 수: {len(all_tables)}")
                 
                 # 디버그 모드일 때만 상세 로그 출력
                 if use_debug:
                     for idx, table in enumerate(all_tables):
-                        class_names = table.get('class', [])
+                        class_names = table.get('class', '').split()
                         logging.info(f"테이블 {idx+1} 클래스: {class_names}")
                 
                 # 테이블이 있으면 첫 번째 테이블로 시도
@@ -201,90 +328,58 @@ async def fetch_detail_page(session, data_item, debug=None):
                 logging.info("두 번째 테이블을 찾았습니다. 내용 파싱 시작")
                 
                 # 테이블의 모든 행을 가져와서 처리
-                rows = meta_table.select('tr')
+                rows = _XP_ROWS(meta_table)
                 logging.info(f"테이블 행 수: {len(rows)}")
                 
                 # 디버깅: 모든 행의 헤더 텍스트 출력 (디버그 모드일 때만)
                 if use_debug:
                     for row_idx, row in enumerate(rows):
-                        headers = row.select('th')
+                        headers = _XP_HEADER_CELLS(row)
                         if headers:
-                            header_texts = [h.get_text(strip=True) for h in headers]
+                            header_texts = [_header_text(h) for h in headers]
                             logging.debug(f"행 {row_idx+1} 헤더: {header_texts}")
                 
                 for row in rows:
                     # 각 행의 헤더(th)와 값(td) 가져오기
-                    headers = row.select('th')
-                    values = row.select('td')
+                    headers = _XP_HEADER_CELLS(row)
+                    values = _XP_VALUE_CELLS(row)
                     
                     # 로깅 추가 (디버그 모드일 때만)
                     if use_debug and headers and values:
-                        header_texts = [h.get_text(strip=True) for h in headers]
+                        header_texts = [_header_text(h) for h in headers]
                         logging.debug(f"행 헤더: {header_texts}")
                     
                     # 헤더와 값이 모두 있는 경우에만 처리
                     for i, header in enumerate(headers):
-                        header_text = header.get_text(strip=True)
+                        header_text = _header_text(header)
                         
                         # 해당 헤더에 대응하는 값이 있는지 확인
                         if i < len(values):
-                            value_text = values[i].get_text(strip=True)
+                            value_text = element_text(values[i])
                             
                             # 헤더 텍스트에 따라 적절한 키로 데이터 저장 - 필요한 필드만 유지
-                            if '파일데이터명' in header_text:
-                                data_item['file_data_name'] = value_text
-                                logging.info(f"파일데이터명 찾음: {value_text}")
-                            elif '분류체계' in header_text:
-                                data_item['category'] = value_text
-                                logging.info(f"분류체계 찾음: {value_text}")
-                            elif '제공기관' in header_text:
-                                data_item['provider'] = value_text
-                            elif '관리부서명' in header_text:
-                                data_item['department'] = value_text
-                                logging.info(f"관리부서명 찾음: {value_text}")
-                            elif '관리부서 전화번호' in header_text:
-                                data_item['contact_phone'] = value_text
-                            elif '수집방법' in header_text:
-                                data_item['collection_method'] = value_text
-                            elif '업데이트 주기' in header_text:
-                                data_item['update_cycle'] = value_text
-                            elif '차기 등록 예정일' in header_text:
-                                data_item['next_update_date'] = value_text
-                            elif '확장자' in header_text:
-                                data_item['extension'] = value_text
-                                logging.info(f"확장자 찾음: {value_text}")
-                            elif '키워드' in header_text:
-                                data_item['keywords'] = value_text.split(',')
-                                logging.info(f"키워드 찾음: {value_text}")
-                            elif '등록일' in header_text:
-                                data_item['register_date'] = value_text
-                                logging.info(f"등록일 찾음: {value_text}")
-                            elif '수정일' in header_text:
-                                data_item['update_date'] = value_text
-                                logging.info(f"수정일 찾음: {value_text}")
-                            elif '제공형태' in header_text:
-                                data_item['provision_type'] = value_text
-                                logging.info(f"제공형태 찾음: {value_text}")
-                            elif '설명' in header_text:
-                                data_item['description'] = value_text
-                                logging.info(f"설명 찾음: 길이 {len(value_text)} 문자")
-                            elif '기타 유의사항' in header_text:
-                                data_item['note'] = value_text
-                                logging.info(f"기타 유의사항 찾음: {value_text}")
-                            elif '이용허락범위' in header_text:
+                            field = _header_field(header_text)
+                            if field is None:
+                                continue
+                            
+                            if field == 'keywords':
+                                data_item[field] = value_text.split(',')
+                            elif field == 'license':
                                 # 이용허락범위는 텍스트 추출이 복잡할 수 있음
-                                license_text = value_text
-                                if not license_text and values[i].select_one('a'):
-                                    license_text = values[i].select_one('a').get_text(strip=True)
-                                data_item['license'] = license_text
-                                logging.info(f"이용허락범위 찾음: {license_text}")
+                                license_links = _XP_FIRST_LINK(values[i])
+                                if not value_text and license_links:
+                                    value_text = element_text(license_links[0])
+                                data_item[field] = value_text
+                            else:
+                                data_item[field] = value_text
+                            logging.debug(f"{header_text} 찾음: {value_text[:100]}")
             else:
                 logging.warning(f"메타데이터 테이블을 찾을 수 없습니다: {detail_url}")
             
             # 다운로드 버튼 확인 - 디버깅 로그 추가
             download_btns = []
-            for elem in soup.select('a, button'):
-                text = elem.get_text(strip=True)
+            for elem in _XP_DOWNLOAD_BUTTONS(tree):
+                text = element_text(elem)
                 if '다운로드' in text and 'meta' not in text.lower():
                     download_btns.append(elem)
             
@@ -300,7 +395,7 @@ async def fetch_detail_page(session, data_item, debug=None):
                 
                 # fileDetailObj.fn_fileDataDown('15104486', 'uddi:4ef35411-d007-426b-8ee7-9fdc1252c80f', '','1', '1')
                 # 위 형식에서 파라미터 추출
-                file_id_matches = re.findall(r"'([^']*)'", onclick_attr)
+                file_id_matches = _ONCLICK_ARGS_RE.findall(onclick_attr)
                 if file_id_matches and len(file_id_matches) >= 2:
                     data_item['file_id'] = file_id_matches[0]
                     data_item['file_detail_id'] = file_id_matches[1]
@@ -312,7 +407,7 @@ async def fetch_detail_page(session, data_item, debug=None):
                     logging.info(f"파일 ID: {data_item['file_id']}, 상세 ID: {data_item['file_detail_id']}")
                 
                 # 다운로드 버튼 텍스트 저장
-                data_item['download_btn_text'] = download_btn.get_text(strip=True)
+                data_item['download_btn_text'] = element_text(download_btn)
             else:
                 data_item['has_download_btn'] = False
                 logging.warning("다운로드 버튼을 찾을 수 없습니다.")
@@ -329,50 +424,125 @@ async def fetch_detail_page(session, data_item, debug=None):
         logging.error(traceback.format_exc())  # 상세 오류 스택트레이스 출력
         return data_item
 
+# 디버그 HTML 묶음 파일명
+_DEBUG_HTML_ARCHIVE = "debug_html.tar"
+
+# 디버그 HTML 기록 태스크
+async def _write_debug_html(queue, archive_path):
+    """큐로 전달된 디버그 HTML을 하나의 tar 파일에 차례로 추가하는 백그라운드 태스크
+    
+    페이지마다 파일을 열고 닫는 대신 단일 기록자가 묶어서 저장합니다. None을 받으면 종료합니다.
+    """
+    count = 0
+    with tarfile.open(archive_path, "w") as archive:
+        while (entry := await queue.get()) is not None:
+            name, content = entry
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            info.mtime = int(time.time())
+            await asyncio.to_thread(archive.addfile, info, io.BytesIO(content))
+            count += 1
+    logging.info(f"디버그 HTML {count}개 저장됨: {archive_path}")
+
+async def _iter_items(items):
+    """리스트와 비동기 이터레이터를 같은 방식으로 순회하기 위한 비동기 제너레이터"""
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
 # 모든 항목의 세부 페이지 접근
-async def enrich_items_with_details(items, limit=0, debug=None):
+async def enrich_items_with_details(items, limit=0, debug=None, rate=None, output_format='json', concurrency=None, limiter=None, semaphore=None):
     """필터링된 항목들의 세부 페이지에 접근하여 추가 정보 수집
     
     Args:
-        items: 수집할 항목 목록
+        items: 수집할 항목 목록 또는 필터링된 항목을 차례로 내주는 비동기 이터레이터 (도착하는 대로 수집 시작)
         limit: 처리할 최대 항목 수 (0=모두)
         debug: 디버그 모드 활성화 여부 (None일 경우 전역 설정 사용)
+        rate: 초당 최대 요청 수 (None일 경우 기본값 사용)
+        output_format: 저장 형식 ('json' 또는 'ndjson')
+        concurrency: 동시에 처리할 세부 페이지 수 (None일 경우 DETAIL_CONCURRENCY)
+        limiter: 다른 단계와 공유할 요청 속도 제한 (None이면 rate로 생성)
+        semaphore: 다른 단계와 공유할 동시 요청 제한 (None이면 concurrency로 생성)
     """
     # 디버그 설정 확인 (None이면 전역 설정 사용)
     use_debug = _DEBUG_ENABLED if debug is None else debug
     
-    if limit > 0:
-        items_to_process = items[:limit]
-        logging.info(f"첫 {len(items_to_process)}개 항목의 세부 정보를 수집합니다.")
-    else:
-        items_to_process = items
-        logging.info(f"모든 {len(items_to_process)}개 항목의 세부 정보를 수집합니다.")
-    
-    enriched_items = []
-    
-    print("\n" + "="*70)
-    print(f"세부 정보 수집 시작: 총 {len(items_to_process)}개 항목")
-    print("="*70)
+    # 병렬 수집을 위한 세마포어 (동시 요청 제한, 함께 실행되는 단계가 넘겨주면 공유)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(concurrency or DETAIL_CONCURRENCY)
+    # 전체 요청 속도 제한 (태스크 간 공유)
+    if limiter is None:
+        limiter = create_rate_limiter(rate)
+    completed = 0
+    total = None  # 입력이 끝나 전체 항목 수가 정해지기 전에는 진행률을 표시하지 않음
+    
+    # 디버그 HTML은 단일 백그라운드 태스크가 하나의 tar 파일로 묶어 저장
+    debug_queue = asyncio.Queue() if use_debug else None
+    debug_writer = None
+    if debug_queue is not None:
+        os.makedirs(_DEBUG_HTML_DIR, exist_ok=True)
+        archive_path = os.path.join(_DEBUG_HTML_DIR, _DEBUG_HTML_ARCHIVE)
+        debug_writer = asyncio.create_task(_write_debug_html(debug_queue, archive_path))
     
-    # 브라우저와 유사한 헤더 적용
-    headers = {**REQUEST_HEADERS, **BROWSER_HEADERS}
-    async with aiohttp.ClientSession(headers=headers) as session:
-        for idx, item in enumerate(items_to_process):
-            title = item.get('title', f"ID:{item.get('data_id', 'unknown')}")
-            print_progress(idx+1, len(items_to_process), title)
+    try:
+        # 브라우저와 유사한 헤더를 세션 기본값으로 적용 (연결 풀은 create_session에서 재사용)
+        async with create_session(headers=DETAIL_SESSION_HEADERS) as session:
+            # 각 항목 처리를 위한 태스크 생성
+            async def process_item(item):
+                nonlocal completed
+                async with semaphore, limiter:  # 동시 요청 수 및 요청 속도 제한
+                    # 세부 페이지 접근 (디버그 옵션 전달)
+                    enriched_item = await fetch_detail_page(session, item, debug=debug, debug_queue=debug_queue)
+                
+                # 진행률 표시 (완료 순서 기준)
+                completed += 1
+                if total is not None:
+                    title = item.get('title', f"ID:{item.get('data_id', 'unknown')}")
+                    print_progress(completed, total, title)
+                return enriched_item
             
-            # 세부 페이지 접근 (디버그 옵션 전달)
-            enriched_item = await fetch_detail_page(session, item, debug=debug)
-            enriched_items.append(enriched_item)
+            # 항목이 도착하는 대로 태스크 시작 (결과는 입력 순서대로 모음)
+            tasks = []
+            async with asyncio.TaskGroup() as tg:
+                async for item in _iter_items(items):
+                    # 제한 수를 넘은 항목은 건너뛰되 입력은 끝까지 소비 (앞 단계가 대기하지 않도록)
+                    if limit > 0 and len(tasks) >= limit:
+                        continue
+                    tasks.append(tg.create_task(process_item(item)))
+                
+                total = len(tasks)
+                if not tasks:
+                    logging.warning("필터링 후 남은 항목이 없습니다.")
+                    return []
+                
+                if limit > 0:
+                    logging.info(f"첫 {total}개 항목의 세부 정보를 수집합니다.")
+                else:
+                    logging.info(f"모든 {total}개 항목의 세부 정보를 수집합니다.")
+                
+                print("\n" + "="*70)
+                print(f"세부 정보 수집 시작: 총 {total}개 항목")
+                print("="*70)
+                
+                # 입력을 기다리는 동안 이미 끝난 항목 반영
+                if completed:
+                    print_progress(completed, total)
             
-            # 과도한 요청 방지를 위한 딜레이
-            await asyncio.sleep(random.uniform(1.0, 2.0))
+            enriched_items = [task.result() for task in tasks]
+    finally:
+        # 남은 디버그 HTML을 모두 기록한 뒤 기록 태스크 종료
+        if debug_writer is not None:
+            debug_queue.put_nowait(None)
+            await debug_writer
     
     print("\n")  # 진행률 표시 후 줄바꿈
     
     # 세부 정보가 추가된 항목들 저장
-    metadata_file = "data_detail.json"  # 원래 파일명으로 되돌림
-    save_metadata(enriched_items, metadata_file)
+    metadata_file = f"data_detail.{output_format}"
+    await asyncio.to_thread(save_metadata, enriched_items, metadata_file)
     logging.info(f"필터링 및 상세정보가 추가된 {len(enriched_items)}개 항목이 '{metadata_file}'에 저장되었습니다.")
     
     # 디버깅: 메타데이터 필드 통계 (디버그 모드일 때만)
@@ -391,7 +561,7 @@ async def enrich_items_with_details(items, limit=0, debug=None):
     return enriched_items
 
 # 목록 데이터 기반 필터링 및 세부 데이터 수집 함수
-async def collect_detail_data(list_file="data_list.json", limit=0, debug=None, debug_html_dir=None):
+async def collect_detail_data(list_file="data_list.json", limit=0, debug=None, debug_html_dir=None, rate=None, output_format='json', concurrency=None):
     """목록 데이터를 로드하고 필터링한 후 세부 정보 수집
     
     Args:
@@ -399,6 +569,9 @@ async def collect_detail_data(list_file="data_list.json", limit=0, debug=None, d
         limit: 처리할 최대 항목 수
         debug: 디버그 모드 활성화 여부 (None일 경우 전역 설정 사용)
         debug_html_dir: HTML 파일 저장 디렉토리 (None일 경우 기본값 사용)
+        rate: 초당 최대 요청 수 (None일 경우 기본값 사용)
+        output_format: 저장 형식 ('json' 또는 'ndjson')
+        concurrency: 동시에 처리할 세부 페이지 수 (None일 경우 DETAIL_CONCURRENCY)
     """
     # 디버그 설정 적용 (main.py에서 전달 받은 설정 적용)
     if debug is not None or debug_html_dir is not None:
@@ -407,30 +580,34 @@ async def collect_detail_data(list_file="data_list.json", limit=0, debug=None, d
             html_dir=debug_html_dir if debug_html_dir is not None else _DEBUG_HTML_DIR
         )
     
-    # 목록 데이터 로드
-    list_data = load_list_data(list_file)
-    if not list_data:
-        return []
-    
-    # 1. 제목 또는 제공기관 기반 필터링
-    title_or_provider_filtered = filter_by_title_or_provider(list_data)
-    if not title_or_provider_filtered:
-        logging.warning("제목/제공기관 필터링 후 남은 항목이 없습니다.")
-        return []
-    
-    # 2. 파일 형식 기반 필터링
-    format_filtered = filter_by_format(title_or_provider_filtered)
-    if not format_filtered:
-        logging.warning("형식 필터링 후 남은 항목이 없습니다.")
+    # 1~3. 목록 데이터를 스트리밍으로 읽으며 제목/제공기관, 파일 형식, 다운로드 버튼 필터를 한 번에 적용 (파일 읽기와 파싱은 이벤트 루프 밖에서 실행)
+    if not os.path.exists(list_file):
+        logging.error(f"목록 데이터 파일을 로드할 수 없습니다: {list_file}")
         return []
-    
-    # 3. 다운로드 버튼 유무 확인
-    download_filtered = filter_by_download_button(format_filtered)
+    download_filtered = await asyncio.to_thread(filter_items, iter_metadata_items(list_file))
     if not download_filtered:
-        logging.warning("다운로드 버튼 필터링 후 남은 항목이 없습니다.")
+        logging.warning("필터링 후 남은 항목이 없습니다.")
         return []
     
     # 4. 세부 페이지에서 추가 정보 수집 (디버그 옵션 전달)
-    detailed_items = await enrich_items_with_details(download_filtered, limit, debug=_DEBUG_ENABLED)
+    detailed_items = await enrich_items_with_details(download_filtered, limit, debug=_DEBUG_ENABLED, rate=rate, output_format=output_format, concurrency=concurrency)
+    
+    return detailed_items
+
+# 목록 단계와 동시에 실행되는 세부 데이터 수집 함수
+async def stream_detail_data(item_queue, limit=0, debug=None, debug_html_dir=None, rate=None, output_format='json', concurrency=None, limiter=None, semaphore=None):
+    """목록 단계가 큐로 넘기는 항목을 받는 즉시 필터링하고 세부 정보를 수집하는 함수
+    
+    Args:
+        item_queue: 목록 항목을 받을 큐 (None을 받으면 입력 종료)
+        limiter, semaphore: 목록 단계와 공유할 요청 속도/동시 요청 제한 (None이면 새로 생성)
+        나머지 인수는 collect_detail_data와 동일
+    """
+    if debug is not None or debug_html_dir is not None:
+        set_debug_mode(
+            enabled=debug if debug is not None else _DEBUG_ENABLED,
+            html_dir=debug_html_dir if debug_html_dir is not None else _DEBUG_HTML_DIR
+        )
     
-    return detailed_items 
\ No newline at end of file
+    return await enrich_items_with_details(_filter_queue_items(item_queue), limit, debug=_DEBUG_ENABLED, rate=rate, output_format=output_format,
+                                           concurrency=concurrency, limiter=limiter, semaphore=semaphore)
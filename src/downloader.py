@@ -3,21 +3,58 @@
 """
 
 import asyncio
-import aiohttp
+import aiofiles
+import codecs
 import os
 import logging
-import json
+import orjson
 import time
-import random
 import re
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-from .config import BASE_URL, REQUEST_HEADERS, DOWNLOAD_BASE_DIR, EXT_MAP
-from .utils import print_progress, save_metadata, convert_encoding, sanitize_filename, record_failed_item, load_metadata
+from .config import BASE_URL, REQUEST_HEADERS, DOWNLOAD_BASE_DIR, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_CONCURRENCY, EXT_MAP
+from .utils import create_session, create_rate_limiter, print_progress, save_metadata, convert_encoding, sanitize_filename, record_failed_item, load_metadata
 
 # 실패 항목 기록 파일
 FAILED_LIST_FILE = "failed_downloads.txt"
+# 파일 ID 캐시 파일 (데이터 ID -> atchFileId, fileDetailSn)
+FILE_ID_CACHE_FILE = "file_id_cache.json"
+# 다운로드 결과 파일 및 중간 저장 간격 (완료 항목 수 기준, 중단되어도 처리 결과 보존)
+DOWNLOAD_RESULTS_FILE = "download_results.json"
+RESULTS_SAVE_INTERVAL = 50
+
+# Content-Disposition 파일명 정규식 (모듈 로드 시 한 번만 컴파일)
+_QUOTED_FILENAME_RE = re.compile(r'filename=["\'](.*?)["\']')
+_BARE_FILENAME_RE = re.compile(r'filename=(.*?)(;|$)')
+
+# HTML 오류 페이지 요약용 정규식 (태그 제거 및 공백 정리)
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+# HTML 응답으로 판단할 본문 시작 부분
+_HTML_SIGNATURES = (b'<!doctype', b'<html')
+_HTML_SNIFF_SIZE = 16  # HTML 여부 판단에 필요한 본문 앞부분 바이트 수 (BOM/공백 제외)
+
+def _content_head(chunk):
+    """본문 앞부분에서 UTF-8 BOM과 앞쪽 공백을 제외한 바이트열을 반환하는 함수 (HTML 여부 판단용)"""
+    return chunk.removeprefix(codecs.BOM_UTF8).lstrip()
+
+# 파일 ID 캐시 로드
+def load_file_id_cache(cache_file=FILE_ID_CACHE_FILE):
+    """이전 실행에서 저장한 파일 ID 캐시를 로드하는 함수"""
+    if not os.path.exists(cache_file):
+        return {}
+    
+    cache = load_metadata(cache_file)
+    if not isinstance(cache, dict):
+        logging.warning(f"파일 ID 캐시를 사용할 수 없습니다: {cache_file}")
+        return {}
+    
+    logging.info(f"파일 ID 캐시에서 {len(cache)}개 항목을 로드했습니다.")
+    return cache
+
+# 이미지로 취급할 매체유형 및 파일 ID에서 인정할 확장자
+_IMAGE_MEDIA_TYPES = frozenset({'이미지', '사진'})
+_FILE_ID_EXTENSIONS = frozenset({'csv', 'xlsx', 'xls', 'json', 'xml', 'hwp', 'pdf', 'docx', 'hwpx'})
 
 # 파일 확장자 결정 함수
 def determine_file_extension(data_item):
@@ -27,40 +64,38 @@ def determine_file_extension(data_item):
     
     # 1. 매체유형 기반 파일 형식 힌트 (이미지/사진인 경우 jpg로 가정)
     media_type = data_item.get('media_type')
-    if media_type in ['이미지', '사진']:
+    if media_type in _IMAGE_MEDIA_TYPES:
         file_ext = 'jpg'  # 이미지/사진인 경우 기본값을 jpg로 설정
     
     # 2. 포맷 태그 기반
     format_types = data_item.get('format_types', [])
-    if format_types:
-        for fmt in format_types:
-            if fmt.upper() in EXT_MAP:
-                file_ext = EXT_MAP[fmt.upper()]
-                logging.debug(f"형식 태그에서 형식 확인: {fmt} -> {file_ext}")
-                break
+    tag_ext = next(filter(None, (EXT_MAP.get(fmt.upper()) for fmt in format_types)), None)
+    if tag_ext:
+        file_ext = tag_ext
+        logging.debug("형식 태그에서 형식 확인: %s -> %s", format_types, file_ext)
     
     # 3. 세부 페이지에서 획득한 정보 활용
-    if 'file_detail_id' in data_item:
-        # 일반적으로 파일명에서 확장자를 추출할 수 있음
-        file_id = data_item.get('file_detail_id', '')
-        if '.' in file_id:
-            ext = file_id.split('.')[-1].lower()
-            if ext in ['csv', 'xlsx', 'xls', 'json', 'xml', 'hwp', 'pdf', 'docx', 'hwpx']:
-                file_ext = ext
-                logging.debug(f"파일 ID에서 확장자 추출: {ext}")
+    # 일반적으로 파일명에서 확장자를 추출할 수 있음
+    file_id = data_item.get('file_detail_id') or ''
+    if '.' in file_id:
+        ext = file_id.rpartition('.')[2].lower()
+        if ext in _FILE_ID_EXTENSIONS:
+            file_ext = ext
+            logging.debug("파일 ID에서 확장자 추출: %s", ext)
     
     return file_ext
 
 # 실제 파일 다운로드
-async def download_file(session, download_url, detail_url, file_path):
-    """실제 파일을 다운로드하는 함수"""
+async def download_file(session, limiter, download_url, detail_url, file_path):
+    """실제 파일을 다운로드하는 함수 (file_path의 디렉토리는 호출 측에서 생성, 요청마다 limiter로 속도 제한)
+    
+    Returns:
+        tuple: (성공 여부, 성공 시 실제 저장 경로 / 실패 시 오류 메시지)
+    """
     try:
-        async with session.get(download_url, headers={
-            "Referer": detail_url,
-            "Accept": "*/*"
-        }) as download_response:
+        async with limiter, session.get(download_url, headers={"Referer": detail_url}) as download_response:
             status = download_response.status
-            logging.debug(f"다운로드 응답 상태: {status}")
+            logging.debug("다운로드 응답 상태: %s", status)
             
             if status != 200:
                 return False, f"다운로드 실패: HTTP 에러 {status}"
@@ -69,19 +104,19 @@ async def download_file(session, download_url, detail_url, file_path):
             content_type = download_response.headers.get('Content-Type', '')
             content_disp = download_response.headers.get('Content-Disposition', '')
             
-            logging.debug(f"응답 Content-Type: {content_type}")
-            logging.debug(f"응답 Content-Disposition: {content_disp}")
+            logging.debug("응답 Content-Type: %s", content_type)
+            logging.debug("응답 Content-Disposition: %s", content_disp)
             
             # Content-Disposition 헤더에서 파일명 추출 시도
             original_ext = None
             if content_disp and 'filename=' in content_disp:
-                filename_match = re.search(r'filename=["\'](.*?)["\']', content_disp)
+                filename_match = _QUOTED_FILENAME_RE.search(content_disp)
                 if not filename_match:
-                    filename_match = re.search(r'filename=(.*?)(;|$)', content_disp)
+                    filename_match = _BARE_FILENAME_RE.search(content_disp)
                 
                 if filename_match:
                     original_filename = filename_match.group(1).strip()
-                    logging.debug(f"서버 제공 파일명: {original_filename}")
+                    logging.debug("서버 제공 파일명: %s", original_filename)
                     
                     # 파일명에서 확장자만 추출
                     if '.' in original_filename:
@@ -97,38 +132,48 @@ async def download_file(session, download_url, detail_url, file_path):
                 logging.info(f"서버 제공 확장자 사용: data.{original_ext}")
                 file_path = new_file_path
             
-            # 파일 데이터 가져오기
-            file_data = await download_response.read()
-            logging.debug(f"수신된 데이터 크기: {len(file_data)} 바이트")
+            # 첫 번째 청크만 먼저 읽어 HTML 응답 여부 확인 (전체 파일을 메모리에 올리지 않음)
+            # 한 번의 read가 짧게 반환될 수 있으므로 BOM/공백을 뺀 내용이 판단에 충분하거나 EOF일 때까지 읽음
+            # (공백만 계속되는 본문을 모두 메모리에 올리지 않도록 청크 크기까지만 모음)
+            first_chunk = await download_response.content.read(DOWNLOAD_CHUNK_SIZE)
+            while (len(_content_head(first_chunk)) < _HTML_SNIFF_SIZE and len(first_chunk) < DOWNLOAD_CHUNK_SIZE
+                   and (more := await download_response.content.read(DOWNLOAD_CHUNK_SIZE))):
+                first_chunk += more
             
             # HTML 응답 검사 (에러 또는 리다이렉트 페이지)
             is_html = False
             if content_type and ('text/html' in content_type or 'application/xhtml' in content_type):
                 is_html = True
-            elif len(file_data) > 10 and (file_data[:10].lower().find(b'<!doctype') != -1 or file_data[:10].lower().find(b'<html') != -1):
+            elif _content_head(first_chunk)[:_HTML_SNIFF_SIZE].lower().startswith(_HTML_SIGNATURES):
                 is_html = True
             
             if is_html:
-                # HTML 응답 내용 확인하여 오류 메시지 추출 시도
+                # HTML 응답 내용 확인하여 오류 메시지 추출 시도 (앞부분 2KB에서 태그만 제거, DOM 생성 없음)
                 try:
-                    html_text = file_data.decode('utf-8', errors='ignore')
-                    soup = BeautifulSoup(html_text, 'html.parser')
-                    error_msg = soup.get_text()[:200]  # 첫 200자만 추출
+                    snippet = _HTML_TAG_RE.sub(' ', first_chunk[:2048].decode('utf-8', errors='ignore'))
+                    error_msg = _WHITESPACE_RE.sub(' ', snippet).strip()[:200]  # 첫 200자만 추출
                     logging.error(f"HTML 응답 수신: {error_msg}...")
                     return False, "다운로드 실패: HTML 페이지가 반환됨"
                 except:
                     logging.error("HTML 응답이 반환됨. 예상되는 파일 형식이 아님")
                     return False, "다운로드 실패: HTML 페이지가 반환됨"
             
-            # 디렉토리 생성 (혹시 모를 누락 방지)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            # 파일 저장
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
+            # 파일 저장 (청크 단위 스트리밍, 디스크 쓰기는 이벤트 루프 밖에서 수행)
+            size = 0
+            try:
+                async with aiofiles.open(file_path, 'wb') as f:
+                    await f.write(first_chunk)
+                    size += len(first_chunk)
+                    async for chunk in download_response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
+                        size += len(chunk)
+            except Exception:
+                # 중간에 끊긴 경우 불완전한 파일 삭제
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                raise
             
-            size = os.path.getsize(file_path)
-            logging.debug(f"파일 다운로드 완료: {os.path.basename(file_path)} ({size} 바이트)")
+            logging.debug("파일 다운로드 완료: %s (%s 바이트)", os.path.basename(file_path), size)
             
             if size == 0:
                 logging.error("다운로드된 파일이 비어 있습니다.")
@@ -139,9 +184,104 @@ async def download_file(session, download_url, detail_url, file_path):
         logging.error(f"파일 다운로드 오류: {str(e)}")
         return False, str(e)
 
+# 파일 ID 조회
+async def get_file_id(session, limiter, data_item, detail_url):
+    """다운로드에 필요한 파일 ID(atchFileId)와 파일 상세 일련번호(fileDetailSn)를 구하는 함수
+    
+    API 조회 -> 메타데이터의 file_detail_id -> 기본 형식 생성 순으로 시도합니다. (API 요청은 limiter로 속도 제한)
+    
+    Returns:
+        tuple: (atch_file_id, file_detail_sn)
+    """
+    data_id = data_item['data_id']
+    
+    # 파일 다운로드 정보 URL
+    file_info_url = f"https://www.data.go.kr/tcs/dss/selectFileDataDownload.do?publicDataPk={data_id}&fileDetailSn=1"
+    logging.debug("파일 메타정보 URL: %s", file_info_url)
+    
+    atch_file_id = None
+    file_detail_sn = "1"  # 기본값
+    
+    # 1단계: API 호출로 파일 ID 정보 획득 시도 (우선 처리)
+    try:
+        async with limiter, session.get(file_info_url, headers={
+            "Referer": detail_url,
+            "Accept": "application/json, text/plain, */*"
+        }) as info_response:
+            if info_response.status != 200:
+                logging.warning(f"메타 정보 요청 실패: HTTP {info_response.status}")
+            else:
+                content_type = info_response.headers.get('Content-Type', '')
+                
+                # JSON 응답인 경우
+                if 'application/json' in content_type:
+                    try:
+                        info_json = orjson.loads(await info_response.read())
+                        logging.debug("메타 정보 응답: %s", info_json)
+                        
+                        if 'fileDataRegistVO' in info_json and info_json['fileDataRegistVO']:
+                            atch_file_id = info_json['fileDataRegistVO'].get('atchFileId')
+                            file_detail_sn = str(info_json['fileDataRegistVO'].get('fileDetailSn', "1"))
+                        elif 'atchFileId' in info_json:
+                            atch_file_id = info_json['atchFileId']
+                            file_detail_sn = str(info_json.get('fileDetailSn', "1"))
+                    except orjson.JSONDecodeError:
+                        logging.warning("JSON 파싱 실패")
+                elif logging.getLogger().isEnabledFor(logging.DEBUG):
+                    # HTML 또는 다른 형식의 응답 (본문은 디버그 로그에만 쓰이므로 디버그 레벨일 때만 읽음)
+                    html_content = await info_response.text(encoding='utf-8', errors='ignore')
+                    logging.debug("비JSON 응답: %s...", html_content[:200])
+    except Exception as e:
+        logging.error(f"메타 정보 요청 중 오류: {str(e)}")
+    
+    # 2단계: API에서 정보를 얻지 못한 경우, 메타데이터의 file_detail_id에서 추출 시도
+    if not atch_file_id and 'file_detail_id' in data_item:
+        file_id_info = data_item.get('file_detail_id', '')
+        logging.debug("메타데이터에서 파일 상세 ID: %s", file_id_info)
+        
+        if file_id_info:
+            # 'uddi:' 접두사 제거
+            clean_id = file_id_info.replace('uddi:', '')
+            
+            # '_' 기준으로 분리
+            parts = clean_id.split('_')
+            
+            if len(parts) >= 2:
+                # 첫 번째 부분을 atch_file_id로, 두 번째 부분을 file_detail_sn으로 처리
+                atch_file_id = parts[0]
+                second_part = parts[1]
+                
+                # 두 번째 부분에 '.' 포함 여부 확인 (확장자가 있는 경우)
+                file_detail_sn = second_part.split('.')[0] if '.' in second_part else second_part
+            else:
+                # '_'가 없으면 전체를 atch_file_id로 사용
+                atch_file_id = clean_id
+                # file_detail_sn은 기본값(1) 유지
+            
+            logging.debug("메타데이터에서 추출한 파일 정보: ID=%s, SN=%s", atch_file_id, file_detail_sn)
+    
+    # 3단계: 이전 단계에서도 파일 ID를 얻지 못한 경우 기본 형식으로 생성
+    if not atch_file_id:
+        # FILE_000000000{data_id} 형식으로 생성 (전체 길이 20자리)
+        atch_file_id = f"FILE_{data_id.zfill(15)}"
+        # 길이 조정 (최대 20자)
+        atch_file_id = atch_file_id[-20:]
+        logging.debug("자동 구성된 파일 ID: %s", atch_file_id)
+    else:
+        logging.debug("획득한 파일 ID: %s, 파일 상세 일련번호: %s", atch_file_id, file_detail_sn)
+    
+    return atch_file_id, file_detail_sn
+
 # 데이터 다운로드
-async def download_item(session, data_item):
-    """데이터 항목 하나를 다운로드하는 함수"""
+async def download_item(session, limiter, data_item, file_id_cache=None):
+    """데이터 항목 하나를 다운로드하는 함수
+    
+    Args:
+        session: HTTP 세션
+        limiter: HTTP 요청마다 적용할 속도 제한 (파일 정보 조회, 다운로드, 재시도 모두 포함)
+        data_item: 데이터 항목
+        file_id_cache: 데이터 ID별 파일 ID 캐시 (None이면 캐시 사용 안 함)
+    """
     try:
         # 필수 정보 확인
         data_id = data_item.get('data_id')
@@ -170,88 +310,21 @@ async def download_item(session, data_item):
         # 메타데이터 파일 경로 설정
         metadata_file_path = os.path.join(data_dir, "metadata.json")
         
-        # 1. 파일 다운로드 정보 URL
-        file_info_url = f"https://www.data.go.kr/tcs/dss/selectFileDataDownload.do?publicDataPk={data_id}&fileDetailSn=1"
-        logging.debug(f"파일 메타정보 URL: {file_info_url}")
-        
-        # 2. 파일 ID 가져오기
-        atch_file_id = None
-        file_detail_sn = "1"  # 기본값
-        
-        # 1단계: API 호출로 파일 ID 정보 획득 시도 (우선 처리)
-        try:
-            async with session.get(file_info_url, headers={
-                "Referer": detail_url,
-                "Accept": "application/json, text/plain, */*"
-            }) as info_response:
-                if info_response.status != 200:
-                    logging.warning(f"메타 정보 요청 실패: HTTP {info_response.status}")
-                else:
-                    content_type = info_response.headers.get('Content-Type', '')
-                    
-                    # JSON 응답인 경우
-                    if 'application/json' in content_type:
-                        try:
-                            info_json = await info_response.json()
-                            logging.debug(f"메타 정보 응답: {info_json}")
-                            
-                            if 'fileDataRegistVO' in info_json and info_json['fileDataRegistVO']:
-                                atch_file_id = info_json['fileDataRegistVO'].get('atchFileId')
-                                file_detail_sn = str(info_json['fileDataRegistVO'].get('fileDetailSn', "1"))
-                            elif 'atchFileId' in info_json:
-                                atch_file_id = info_json['atchFileId']
-                                file_detail_sn = str(info_json.get('fileDetailSn', "1"))
-                        except json.JSONDecodeError:
-                            logging.warning("JSON 파싱 실패")
-                    else:
-                        # HTML 또는 다른 형식의 응답
-                        html_content = await info_response.text()
-                        logging.debug(f"비JSON 응답: {html_content[:200]}...")
-        except Exception as e:
-            logging.error(f"메타 정보 요청 중 오류: {str(e)}")
-        
-        # 2단계: API에서 정보를 얻지 못한 경우, 메타데이터의 file_detail_id에서 추출 시도
-        if not atch_file_id and 'file_detail_id' in data_item:
-            file_id_info = data_item.get('file_detail_id', '')
-            logging.debug(f"메타데이터에서 파일 상세 ID: {file_id_info}")
-            
-            if file_id_info:
-                # 'uddi:' 접두사 제거
-                clean_id = file_id_info.replace('uddi:', '')
-                
-                # '_' 기준으로 분리
-                parts = clean_id.split('_')
-                
-                if len(parts) >= 2:
-                    # 첫 번째 부분을 atch_file_id로, 두 번째 부분을 file_detail_sn으로 처리
-                    atch_file_id = parts[0]
-                    second_part = parts[1]
-                    
-                    # 두 번째 부분에 '.' 포함 여부 확인 (확장자가 있는 경우)
-                    file_detail_sn = second_part.split('.')[0] if '.' in second_part else second_part
-                else:
-                    # '_'가 없으면 전체를 atch_file_id로 사용
-                    atch_file_id = clean_id
-                    # file_detail_sn은 기본값(1) 유지
-                
-                logging.debug(f"메타데이터에서 추출한 파일 정보: ID={atch_file_id}, SN={file_detail_sn}")
-        
-        # 3단계: 이전 단계에서도 파일 ID를 얻지 못한 경우 기본 형식으로 생성
-        if not atch_file_id:
-            # FILE_000000000{data_id} 형식으로 생성 (전체 길이 20자리)
-            atch_file_id = f"FILE_{data_id.zfill(15)}"
-            # 길이 조정 (최대 20자)
-            atch_file_id = atch_file_id[-20:]
-            logging.debug(f"자동 구성된 파일 ID: {atch_file_id}")
+        # 1. 파일 ID 가져오기 (캐시에 있으면 API 조회 생략)
+        cached = file_id_cache.get(data_id) if file_id_cache is not None else None
+        if cached:
+            atch_file_id = cached['atch_file_id']
+            file_detail_sn = cached['file_detail_sn']
+            logging.debug("캐시된 파일 ID 사용: %s, 파일 상세 일련번호: %s", atch_file_id, file_detail_sn)
         else:
-            logging.debug(f"획득한 파일 ID: {atch_file_id}, 파일 상세 일련번호: {file_detail_sn}")
+            atch_file_id, file_detail_sn = await get_file_id(session, limiter, data_item, detail_url)
         
-        # 3. 실제 다운로드 URL 생성 및 다운로드 시도
+        # 2. 실제 다운로드 URL 생성 및 다운로드 시도
         download_url = f"https://www.data.go.kr/cmm/cmm/fileDownload.do?atchFileId={atch_file_id}&fileDetailSn={file_detail_sn}"
-        logging.debug(f"다운로드 URL: {download_url}")
+        logging.debug("다운로드 URL: %s", download_url)
         
-        # 4. 파일 다운로드
-        success, result = await download_file(session, download_url, detail_url, data_file_path)
+        # 3. 파일 다운로드
+        success, result = await download_file(session, limiter, download_url, detail_url, data_file_path)
         
         # 첫 번째 시도가 실패하면 다양한 file_detail_sn 값으로 재시도
         if not success:
@@ -264,32 +337,45 @@ async def download_item(session, data_item):
             if file_detail_sn != "1":
                 retry_sns.append("1")
                 
-            logging.debug(f"다운로드 실패, 다른 fileDetailSn 값으로 재시도: {retry_sns}")
+            logging.debug("다운로드 실패, 다른 fileDetailSn 값으로 재시도: %s", retry_sns)
             
             # 다양한 fileDetailSn 값으로 재시도
             for retry_sn in retry_sns:
                 retry_url = f"https://www.data.go.kr/cmm/cmm/fileDownload.do?atchFileId={atch_file_id}&fileDetailSn={retry_sn}"
-                logging.debug(f"재시도 URL: {retry_url}")
-                success, result = await download_file(session, retry_url, detail_url, data_file_path)
+                logging.debug("재시도 URL: %s", retry_url)
+                success, result = await download_file(session, limiter, retry_url, detail_url, data_file_path)
                 if success:
                     logging.info(f"fileDetailSn={retry_sn}로 다운로드 성공")
+                    file_detail_sn = retry_sn
                     break
         
+        # 파일 ID 캐시 갱신 (성공한 조합만 저장, 실패한 캐시 항목은 제거)
+        if file_id_cache is not None:
+            if success:
+                file_id_cache[data_id] = {'atch_file_id': atch_file_id, 'file_detail_sn': file_detail_sn}
+            else:
+                file_id_cache.pop(data_id, None)
+        
         if not success:
             # 모든 시도가 실패한 경우 API 구조가 변경되었을 수 있음
             logging.error(f"모든 다운로드 시도 실패: {result}")
             
             # 데이터 ID로 직접 다운로드 URL 시도 (마지막 수단)
             last_resort_url = f"https://www.data.go.kr/tcs/dss/selectFileDataDownload.do?publicDataPk={data_id}&file_detail_sn=1"
-            logging.debug(f"최종 시도 URL: {last_resort_url}")
-            success, result = await download_file(session, last_resort_url, detail_url, data_file_path)
+            logging.debug("최종 시도 URL: %s", last_resort_url)
+            success, result = await download_file(session, limiter, last_resort_url, detail_url, data_file_path)
             
             if not success:
                 return False, data_item['title'], result
         
+        # 서버 제공 확장자로 저장 경로가 바뀌었을 수 있으므로 실제 저장된 경로 사용
+        data_file_path = result
+        file_ext = os.path.splitext(data_file_path)[1][1:] or file_ext
+        
         # CSV 파일인 경우 인코딩 변환 시도
         if file_ext.lower() in ['csv']:
-            convert_encoding(data_file_path)
+            # 대용량 파일 변환이 이벤트 루프를 막지 않도록 별도 스레드에서 실행
+            await asyncio.to_thread(convert_encoding, data_file_path)
         
         # 메타데이터 저장
         download_info = {
@@ -301,12 +387,11 @@ async def download_item(session, data_item):
             'file_detail_sn': file_detail_sn
         }
         
-        # 기존 메타데이터와 다운로드 정보 결합
-        metadata = data_item.copy()
-        metadata['download_info'] = download_info
+        # 기존 메타데이터와 다운로드 정보 결합 (원본 항목은 변경하지 않고 한 번에 생성)
+        metadata = {**data_item, 'download_info': download_info}
         
         # 메타데이터 저장
-        save_metadata(metadata, metadata_file_path)
+        await asyncio.to_thread(save_metadata, metadata, metadata_file_path)
         
         return True, data_item['title'], data_dir
     
@@ -314,11 +399,39 @@ async def download_item(session, data_item):
         logging.error(f"다운로드 오류: {str(e)}")
         return False, data_item['title'], str(e)
 
+# 다운로드 결과 요약
+def _summarize_download_results(results, total_attempts):
+    """항목별 처리 결과를 상태별로 분류하여 download_results.json 형식으로 만드는 함수"""
+    grouped = {'success': [], 'failed': [], 'skipped': []}
+    for result in results:
+        entry = dict(result)
+        grouped[entry.pop('status')].append(entry)
+    
+    return {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'total_attempts': total_attempts,
+        'success_count': len(grouped['success']),
+        'failed_count': len(grouped['failed']),
+        'skipped_count': len(grouped['skipped']),
+        'success_items': grouped['success'],
+        'failed_items': grouped['failed'],
+        'skipped_items': grouped['skipped']
+    }
+
 # 필터링된 데이터 기반 다운로드
-async def download_filtered_data(filtered_file="data_detail.json", num_downloads=0, selected_ids=None):
-    """상세정보 데이터 파일에서 항목을 로드하여 다운로드하는 함수"""
-    # 상세정보 데이터 파일 로드
-    items = load_metadata(filtered_file)
+async def download_filtered_data(filtered_file="data_detail.json", num_downloads=0, selected_ids=None, rate=None, concurrency=None, force=False):
+    """상세정보 데이터 파일에서 항목을 로드하여 다운로드하는 함수
+    
+    Args:
+        filtered_file: 상세정보 데이터 파일 경로
+        num_downloads: 다운로드할 최대 항목 수 (0=모두)
+        selected_ids: 선택적으로 다운로드할 데이터 ID 목록
+        rate: 초당 최대 요청 수 (None일 경우 기본값 사용)
+        concurrency: 동시에 다운로드할 항목 수 (None일 경우 DOWNLOAD_CONCURRENCY)
+        force: 이미 다운로드된 항목(metadata.json 존재)도 다시 다운로드할지 여부
+    """
+    # 상세정보 데이터 파일 로드 (읽기와 파싱은 이벤트 루프 밖에서 실행)
+    items = await asyncio.to_thread(load_metadata, filtered_file)
     if not items:
         logging.error(f"세부정보 데이터 파일을 로드할 수 없습니다: {filtered_file}")
         return [], [], []
@@ -342,69 +455,98 @@ async def download_filtered_data(filtered_file="data_detail.json", num_downloads
     # 다운로드 디렉토리 생성
     os.makedirs(DOWNLOAD_BASE_DIR, exist_ok=True)
     
+    # 전체 요청 속도 제한
+    limiter = create_rate_limiter(rate)
+    
+    # 파일 ID 캐시 로드 (재실행 시 파일 정보 API 조회 생략)
+    file_id_cache = await asyncio.to_thread(load_file_id_cache)
+    
     # 세션 생성
-    async with aiohttp.ClientSession(headers=REQUEST_HEADERS) as session:
+    async with create_session(headers=REQUEST_HEADERS) as session:
         print("\n" + "="*70)
         print(f"다운로드 시작: 총 {len(download_items)}개 항목")
         print("="*70)
         
-        downloaded = []
-        failed = []
-        skipped = []
+        # 병렬 다운로드를 위한 세마포어 (동시 요청 제한)
+        semaphore = asyncio.Semaphore(concurrency or DOWNLOAD_CONCURRENCY)
+        completed = 0
         
-        for idx, item in enumerate(download_items):
-            # 진행률 표시
+        # 각 항목 처리를 위한 태스크 생성
+        async def process_item(item):
+            nonlocal completed
             title = item.get('title', '')
-            print_progress(idx+1, len(download_items), title)
             
-            # 다운로드 버튼이 없는 항목은 건너뛰기
+            # 다운로드 버튼이 없는 항목 및 이전 실행에서 이미 받은 항목은 건너뛰기
+            # (metadata.json은 다운로드가 성공한 뒤에만 저장되므로 완료 표시로 사용)
+            skip_reason = None
             if not item.get('has_download_btn', True):
-                logging.debug(f"다운로드 버튼 없음: {title} - 건너뜁니다")
-                skipped.append({
+                skip_reason = '다운로드 버튼 없음'
+            elif not force and item.get('data_id') and os.path.isfile(os.path.join(DOWNLOAD_BASE_DIR, item['data_id'], "metadata.json")):
+                skip_reason = '이미 다운로드됨'
+            
+            if skip_reason:
+                logging.debug("%s: %s - 건너뜁니다", skip_reason, title)
+                completed += 1
+                print_progress(completed, len(download_items), title)
+                return {
+                    'status': 'skipped',
                     'title': title,
                     'data_id': item.get('data_id', ''),
-                    'reason': '다운로드 버튼 없음'
-                })
-                continue
+                    'reason': skip_reason
+                }
             
-            # 다운로드 시도
-            success, title, result = await download_item(session, item)
+            # 다운로드 시도 (동시 다운로드 수 제한, 요청 속도는 HTTP 요청마다 제한)
+            async with semaphore:
+                success, title, result = await download_item(session, limiter, item, file_id_cache)
             
+            completed += 1
             if success:
-                print_progress(idx+1, len(download_items), title, success=True)
-                logging.debug(f"다운로드 성공: {result}")
-                downloaded.append({
+                print_progress(completed, len(download_items), title, success=True)
+                logging.debug("다운로드 성공: %s", result)
+                return {
+                    'status': 'success',
                     'data_id': item.get('data_id', ''),
                     'title': title,
                     'dir_path': result
-                })
+                }
             else:
-                print_progress(idx+1, len(download_items), title, success=False)
+                print_progress(completed, len(download_items), title, success=False)
                 logging.error(f"다운로드 실패: {result}")
-                record_failed_item(FAILED_LIST_FILE, title, result)
-                failed.append({
+                record_failed_item(failed_file, title, result)
+                return {
+                    'status': 'failed',
                     'data_id': item.get('data_id', ''),
                     'title': title,
                     'reason': result
-                })
-            
-            # 과도한 요청 방지를 위한 딜레이
-            await asyncio.sleep(random.uniform(1.0, 2.0))
+                }
         
-        # 다운로드 결과 저장
-        download_results = {
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-            'total_attempts': len(download_items),
-            'success_count': len(downloaded),
-            'failed_count': len(failed),
-            'skipped_count': len(skipped),
-            'success_items': downloaded,
-            'failed_items': failed,
-            'skipped_items': skipped
-        }
+        # 완료된 항목 결과 (완료 순서) 및 중간 저장 잠금 (동시에 같은 파일을 쓰지 않도록)
+        finished = []
+        snapshot_lock = asyncio.Lock()
+        
+        # 항목 처리 후 일정 개수마다 지금까지의 결과를 중간 저장
+        async def process_and_record(item):
+            result = await process_item(item)
+            finished.append(result)
+            if len(finished) % RESULTS_SAVE_INTERVAL == 0 and len(finished) < len(download_items):
+                snapshot = _summarize_download_results(finished, len(download_items))
+                async with snapshot_lock:
+                    await asyncio.to_thread(save_metadata, snapshot, DOWNLOAD_RESULTS_FILE)
+            return result
+        
+        # 모든 항목 동시 처리 (결과는 입력 순서대로 반환됨)
+        # 실패 목록 파일은 실행 중 한 번만 열고 줄 단위 버퍼링으로 바로 기록
+        with open(FAILED_LIST_FILE, 'a', encoding='utf-8', buffering=1) as failed_file:
+            tasks = [process_and_record(item) for item in download_items]
+            results = await asyncio.gather(*tasks)
+        
+        # 결과 분류 및 다운로드 결과 저장
+        download_results = _summarize_download_results(results, len(download_items))
+        
+        # 파일 ID 캐시 저장
+        await asyncio.to_thread(save_metadata, file_id_cache, FILE_ID_CACHE_FILE)
         
-        download_results_file = "download_results.json"
-        save_metadata(download_results, download_results_file)
-        logging.info(f"다운로드 결과가 '{download_results_file}'에 저장되었습니다.")
+        await asyncio.to_thread(save_metadata, download_results, DOWNLOAD_RESULTS_FILE)
+        logging.info(f"다운로드 결과가 '{DOWNLOAD_RESULTS_FILE}'에 저장되었습니다.")
         
-        return downloaded, failed, skipped 
\ No newline at end of file
+        return download_results['success_items'], download_results['failed_items'], download_results['skipped_items'] 
\ No newline at end of file
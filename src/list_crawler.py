@@ -5,112 +5,173 @@
 """
 
 import asyncio
-import aiohttp
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
 import re
-import json
 import logging
 import os
-import random
 from urllib.parse import urljoin
 
-from .config import BASE_URL, LIST_URL, REQUEST_HEADERS
-from .utils import print_progress, save_metadata
+from .config import BASE_URL, LIST_URL, REQUEST_HEADERS, LIST_CONCURRENCY
+from .utils import create_session, create_rate_limiter, print_progress, save_metadata, write_ndjson, xpath_class, element_text, get_html_parser
+
+# 정규식 패턴 (모듈 로드 시 한 번만 컴파일)
+_UPDATE_PAGE_RE = re.compile(r'updatePage\((\d+)\)')  # 페이지 이동 onclick 속성
+_TOTAL_COUNT_RE = re.compile(r'총\s*([0-9,]+)\s*건')  # 검색 결과 총 건수
+_DATA_ID_RE = re.compile(r'/data/(\d+)/fileData')  # 상세 페이지 URL의 데이터 ID
+
+# 페이지 수 계산용 XPath (모듈 로드 시 한 번만 컴파일)
+_XP_PAGINATION = etree.XPath(f'//nav[{xpath_class("pagination")}]')
+_XP_LAST_PAGE_BUTTON = etree.XPath(f'//nav[{xpath_class("pagination")}]//a[{xpath_class("control")} and {xpath_class("last")}]')
+_XP_RESULT_COUNT = etree.XPath(f'//*[{xpath_class("result-count")}]//strong')
+_XP_FIRST_STRONG = etree.XPath('(//strong)[1]')
+
+# 총 페이지 수 캐시 (검색 파라미터 -> 페이지 수) 및 진행 중인 조회
+_page_count_cache = {}
+_page_count_inflight = {}
 
 # 페이지 목록 가져오기
 async def get_page_count(session, params):
-    """검색 결과의 총 페이지 수를 가져오는 함수"""
+    """검색 결과의 총 페이지 수를 가져오는 함수 (같은 검색 파라미터는 한 번만 조회)"""
+    key = frozenset(params.items())
+    if key in _page_count_cache:
+        logging.debug(f"캐시된 총 페이지 수 사용: {_page_count_cache[key]}")
+        return _page_count_cache[key]
+    
+    # 동시에 같은 파라미터로 호출되면 진행 중인 조회 결과를 공유
+    task = _page_count_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_page_count(session, params))
+        _page_count_inflight[key] = task
+        task.add_done_callback(lambda _: _page_count_inflight.pop(key, None))
+    
+    max_page = await asyncio.shield(task)
+    if max_page is None:  # 조회 실패는 캐시하지 않음
+        return 1
+    
+    _page_count_cache[key] = max_page
+    return max_page
+
+# 총 페이지 수 조회
+async def _fetch_page_count(session, params):
+    """검색 결과 페이지에서 총 페이지 수를 계산하는 함수 (요청 실패 시 None)"""
     async with session.get(LIST_URL, params=params) as response:
         if response.status != 200:
             logging.error(f"페이지 정보 조회 실패: HTTP {response.status}")
-            return 1
+            return None
             
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # 방법 1: '마지막 페이지' 버튼에서 직접 페이지 번호 추출
-        last_page_button = soup.select_one('nav.pagination a.control.last')
-        if last_page_button:
-            onclick_attr = last_page_button.get('onclick', '')
-            page_match = re.search(r'updatePage\((\d+)\)', onclick_attr)
-            if page_match:
-                max_page = int(page_match.group(1))
-                logging.info(f"마지막 페이지 버튼에서 총 페이지 수 확인: {max_page}")
-                return max_page
-        
-        # 방법 2: 검색 결과 수에서 페이지 수 계산
-        count_text = soup.select_one('.result-count strong')
-        if not count_text:
-            count_text = soup.select_one('strong')  # 다른 위치의 strong 태그 확인
-        
-        if count_text:
-            count_text = count_text.text
-            count_match = re.search(r'총\s*([0-9,]+)\s*건', count_text)
-            if count_match:
-                total_count = int(count_match.group(1).replace(',', ''))
-                per_page = int(params.get('perPage', 10))
-                max_page = (total_count + per_page - 1) // per_page  # 올림 나눗셈
-                logging.info(f"검색 결과 총 {total_count}건, 페이지당 {per_page}개, 총 페이지 수: {max_page}")
-                return max_page
-        
-        # 방법 3: 페이지네이션에서 숫자 찾기
-        pagination = soup.select('nav.pagination a')
-        max_page = 1
-        
-        for page_link in pagination:
-            onclick_attr = page_link.get('onclick', '')
-            page_match = re.search(r'updatePage\((\d+)\)', onclick_attr)
-            if page_match:
-                try:
-                    page_num = int(page_match.group(1))
-                    if page_num > max_page:
-                        max_page = page_num
-                except (ValueError, TypeError):
-                    continue
-        
-        logging.info(f"페이지네이션에서 찾은 최대 페이지 번호: {max_page}")
-        return max_page
+        # 바이트 그대로 파서에 전달 (응답 charset은 디코딩 힌트로만 사용)
+        body = await response.read()
+        encoding = response.charset or 'utf-8'
+    
+    if not body.strip():
+        logging.error("페이지 정보 조회 실패: 응답이 비어 있습니다.")
+        return None
+    
+    tree = lxml_html.document_fromstring(body, parser=get_html_parser(encoding))
+    
+    # 방법 1: '마지막 페이지' 버튼에서 직접 페이지 번호 추출
+    last_page_buttons = _XP_LAST_PAGE_BUTTON(tree)
+    if last_page_buttons:
+        onclick_attr = last_page_buttons[0].get('onclick', '')
+        page_match = _UPDATE_PAGE_RE.search(onclick_attr)
+        if page_match:
+            max_page = int(page_match.group(1))
+            logging.info(f"마지막 페이지 버튼에서 총 페이지 수 확인: {max_page}")
+            return max_page
+    
+    # 방법 2: 검색 결과 수에서 페이지 수 계산 (없으면 다른 위치의 strong 태그 확인)
+    count_elements = _XP_RESULT_COUNT(tree) or _XP_FIRST_STRONG(tree)
+    if count_elements:
+        count_text = count_elements[0].text_content()
+        count_match = _TOTAL_COUNT_RE.search(count_text)
+        if count_match:
+            total_count = int(count_match.group(1).replace(',', ''))
+            per_page = int(params.get('perPage', 10))
+            max_page = (total_count + per_page - 1) // per_page  # 올림 나눗셈
+            logging.info(f"검색 결과 총 {total_count}건, 페이지당 {per_page}개, 총 페이지 수: {max_page}")
+            return max_page
+    
+    # 방법 3: 페이지네이션에서 숫자 찾기 (페이지네이션 HTML 전체에 정규식 한 번 적용)
+    paginations = _XP_PAGINATION(tree)
+    page_nums = _UPDATE_PAGE_RE.findall(etree.tostring(paginations[0], encoding='unicode')) if paginations else []
+    max_page = max(map(int, page_nums), default=1)
+    
+    logging.info(f"페이지네이션에서 찾은 최대 페이지 번호: {max_page}")
+    return max_page
+
+# 목록 항목 XPath (모듈 로드 시 한 번만 컴파일)
+_XP_LIST_ITEMS = etree.XPath(f'//div[{xpath_class("result-list")}]/ul/li')
+_XP_TITLE = etree.XPath('.//dl//dt//a')
+_FORMAT_SPAN_COND = f'{xpath_class("data-format")} or {xpath_class("tagset")}'
+_XP_FORMAT_SPANS = etree.XPath(f'.//dl//dt//span[{_FORMAT_SPAN_COND}]')
+# 제목 링크의 텍스트 중 파일 형식 태그(span) 밖의 텍스트만 선택
+_XP_TITLE_TEXT = etree.XPath(
+    f'.//text()[not(ancestor::span[{_FORMAT_SPAN_COND}]) and not(parent::script or parent::style or parent::template)]'
+)
+_XP_DATA_SPAN = etree.XPath(f'./span[{xpath_class("data")}]')
+_XP_DOWNLOAD_BTN = etree.XPath(
+    f'.//a[contains(., "다운로드") or {xpath_class("download-btn")} '
+    f'or {xpath_class("btn-download")} or contains(@onclick, "download")]'
+)
+
+# 항목 정보 문단(<p>)의 라벨 -> 데이터 항목 필드 매핑
+_INFO_LABEL_FIELDS = {
+    '제공기관': 'provider',
+}
+
+# 항목 정보 문단 추출
+def _extract_info_fields(item):
+    """항목의 <p> 요소를 한 번만 순회하며 라벨별 값(span.data)을 추출하는 함수"""
+    fields = {}
+    for p in item.iter('p'):
+        p_text = element_text(p)
+        for label, field in _INFO_LABEL_FIELDS.items():
+            if field in fields or label not in p_text:
+                continue
+            data_spans = _XP_DATA_SPAN(p)
+            if data_spans:
+                fields[field] = element_text(data_spans[0])
+        if len(fields) == len(_INFO_LABEL_FIELDS):
+            break
+    return fields
 
 # 단일 데이터 항목 파싱 (목록화 단계: 간단한 정보만 추출)
 def parse_data_item(item):
-    """검색 결과의 단일 항목에서 기본 정보만 파싱하는 함수"""
+    """검색 결과의 단일 항목(lxml 요소)에서 기본 정보만 파싱하는 함수"""
     try:
         # 제목 요소 찾기 - dt > a 요소
-        title_element = item.select_one('dl dt a')
-        if not title_element:
+        title_elements = _XP_TITLE(item)
+        if not title_elements:
             return None
+        title_element = title_elements[0]
         
-        # 제목 텍스트 추출
-        full_title = title_element.get_text(strip=True)
-        
-        # 기본 제목 처리
-        title_text = full_title.strip()
+        # 제목 텍스트 추출 - 링크 안의 파일 형식 태그(span)는 제외
+        title_text = ''.join(text.strip() for text in _XP_TITLE_TEXT(title_element))
         
         # 상세 페이지 URL 추출
         detail_url = None
-        if title_element.has_attr('href'):
-            detail_url = urljoin(BASE_URL, title_element['href'])
+        href = title_element.get('href')
+        if href is not None:
+            detail_url = urljoin(BASE_URL, href)
         
         # 상세 페이지 URL에서 데이터 ID 추출
         data_id = None
         if detail_url:
-            data_id_match = re.search(r'/data/(\d+)/fileData', detail_url)
+            data_id_match = _DATA_ID_RE.search(detail_url)
             if data_id_match:
                 data_id = data_id_match.group(1)
         
-        # 파일 형식 추출 (간단히)
-        format_spans = item.select('dl dt a span.data-format, dl dt a span.tagset, dl dt span.data-format, dl dt span.tagset')
-        format_types = [span.get_text(strip=True) for span in format_spans if span.get_text(strip=True)]
+        # 파일 형식 추출 (간단히) - dt 하위의 형식 태그
+        format_spans = _XP_FORMAT_SPANS(item)
+        format_types = [text for text in (element_text(span) for span in format_spans) if text]
         
-        # 제공기관 정보 추출
-        provider_elem = item.select_one('p:contains("제공기관") > span.data')
-        provider = provider_elem.get_text(strip=True) if provider_elem else None
+        # 제공기관 등 정보 문단 추출 (<p> 요소 단일 순회)
+        info_fields = _extract_info_fields(item)
+        provider = info_fields.get('provider')
         
         # 다운로드 버튼 유무 확인 - 목록에서 대략적으로만 판단
-        has_download_btn = False
-        download_btn = item.select_one('a:contains("다운로드"), a.download-btn, a.btn-download, a[onclick*="download"]')
-        if download_btn:
-            has_download_btn = True
+        download_btns = _XP_DOWNLOAD_BTN(item)
+        has_download_btn = bool(download_btns)
         
         # 간략 데이터 항목 정보 수집 (목록화 단계에 필요한 최소 정보)
         data_item = {
@@ -127,9 +188,34 @@ def parse_data_item(item):
         logging.error(f"데이터 항목 추출 오류: {e}")
         return None
 
+# 페이지 HTML 파싱
+def parse_page_html(html, encoding='utf-8'):
+    """목록 페이지 HTML(bytes 또는 str)에서 데이터 항목(dict) 목록을 추출하는 함수"""
+    # lxml로 직접 파싱 (항목별 CSS 선택자 해석 비용 제거)
+    parser = get_html_parser(encoding) if isinstance(html, bytes) else None
+    tree = lxml_html.document_fromstring(html, parser=parser)
+    
+    # 데이터셋 목록의 각 항목 찾기
+    list_items = _XP_LIST_ITEMS(tree)
+    
+    # 각 항목 파싱
+    data_items = []
+    for item in list_items:
+        data_item = parse_data_item(item)
+        if data_item:
+            data_items.append(data_item)
+    
+    return data_items
+
 # 페이지 데이터 추출
 async def extract_page_data(session, page_num, params):
-    """특정 페이지의 데이터 항목들을 추출하는 함수"""
+    """특정 페이지의 데이터 항목들을 추출하는 함수
+    
+    Args:
+        session: HTTP 세션
+        page_num: 페이지 번호
+        params: 검색 파라미터
+    """
     # 페이지 번호 설정
     current_params = params.copy()
     current_params['currentPage'] = page_num
@@ -139,26 +225,33 @@ async def extract_page_data(session, page_num, params):
             logging.error(f"페이지 {page_num} 접근 실패: HTTP {response.status}")
             return []
             
-        html = await response.text()
-        soup = BeautifulSoup(html, 'html.parser')
-        
-        # 데이터셋 목록의 각 항목 찾기
-        list_items = soup.select('div.result-list > ul > li')
-        
-        # 각 항목 파싱
-        data_items = []
-        for item in list_items:
-            data_item = parse_data_item(item)
-            if data_item:
-                data_items.append(data_item)
-        
-        return data_items
+        # 바이트 그대로 파서에 전달 (응답 charset은 디코딩 힌트로만 사용)
+        body = await response.read()
+        encoding = response.charset or 'utf-8'
+    
+    if not body.strip():
+        logging.error(f"페이지 {page_num} 응답이 비어 있습니다.")
+        return []
+    
+    return parse_page_html(body, encoding)
 
 # 데이터 목록화 함수
-async def collect_list_data(keyword, max_pages=0):
-    """페이지네이션 화면에서 기본 데이터만 수집하는 함수"""
+async def collect_list_data(keyword, max_pages=0, rate=None, extra_params=None, output_format='json', concurrency=None, item_queue=None, limiter=None, semaphore=None):
+    """페이지네이션 화면에서 기본 데이터만 수집하는 함수
+    
+    Args:
+        keyword: 검색 키워드
+        max_pages: 처리할 최대 페이지 수 (0=모두)
+        rate: 초당 최대 요청 수 (None일 경우 기본값 사용)
+        extra_params: 검색 요청에 추가할 서버 측 필터 파라미터 (예: 제공기관, 확장자)
+        output_format: 저장 형식 ('json': 종료 시 한 번에 저장, 'ndjson': 페이지마다 이어 쓰기)
+        concurrency: 동시에 요청할 목록 페이지 수 (None일 경우 LIST_CONCURRENCY)
+        item_queue: 수집한 항목을 페이지 순서대로 바로 넘겨줄 큐 (None이면 사용하지 않음)
+        limiter: 다른 단계와 공유할 요청 속도 제한 (None이면 rate로 생성)
+        semaphore: 다른 단계와 공유할 동시 요청 제한 (None이면 concurrency로 생성)
+    """
     # 세션 생성
-    async with aiohttp.ClientSession(headers=REQUEST_HEADERS) as session:
+    async with create_session(headers=REQUEST_HEADERS) as session:
         # 검색 파라미터 설정
         params = {
             "dType": "FILE",
@@ -167,6 +260,11 @@ async def collect_list_data(keyword, max_pages=0):
             "perPage": 10
         }
         
+        # 서버 측 필터 파라미터 추가 (불필요한 페이지 수집 및 파싱 감소)
+        if extra_params:
+            params.update(extra_params)
+            logging.info(f"추가 검색 파라미터: {extra_params}")
+        
         # 총 페이지 수 가져오기
         total_pages = await get_page_count(session, params)
         
@@ -185,20 +283,59 @@ async def collect_list_data(keyword, max_pages=0):
         print(f"데이터 목록화 시작: 총 {pages_to_fetch}개 페이지 탐색")
         print("="*70)
         
-        for page_num in range(1, pages_to_fetch + 1):
-            # 진행률 표시
-            print_progress(page_num, pages_to_fetch, f"페이지 {page_num}")
+        # 병렬 수집을 위한 세마포어 (동시 요청 제한, 함께 실행되는 단계가 넘겨주면 공유)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(concurrency or LIST_CONCURRENCY)
+        # 전체 요청 속도 제한 (태스크 간 공유)
+        if limiter is None:
+            limiter = create_rate_limiter(rate)
+        completed = 0
+        
+        # NDJSON 형식은 파일을 한 번만 열고 페이지가 끝날 때마다 이어 씀 (중단되어도 수집분 보존)
+        metadata_file = f"data_list.{output_format}"  # 목록화 결과 저장 파일
+        ndjson_file = open(metadata_file, 'wb') if output_format == 'ndjson' else None
+        
+        # 기록하거나 큐로 넘길 차례가 아직 안 된 페이지 결과 (앞 페이지가 끝날 때까지 보관)
+        pending_pages = {}
+        next_page = 1
+        
+        # 각 페이지 처리를 위한 태스크 생성
+        async def fetch_page(page_num):
+            nonlocal completed, next_page
+            async with semaphore, limiter:  # 동시 요청 수 및 요청 속도 제한
+                data_items = await extract_page_data(session, page_num, params)
             
-            data_items = await extract_page_data(session, page_num, params)
+            # 완료 순서와 관계없이 페이지 순서대로 NDJSON 기록 및 큐 전달 (파일과 다음 단계의 순서를 목록 순서와 동일하게 유지)
+            if ndjson_file is not None or item_queue is not None:
+                pending_pages[page_num] = data_items
+                while next_page in pending_pages:
+                    page_items = pending_pages.pop(next_page)
+                    if ndjson_file is not None and page_items:
+                        write_ndjson(ndjson_file, page_items)
+                    if item_queue is not None:
+                        for item in page_items:
+                            item_queue.put_nowait(item)
+                    next_page += 1
             
+            # 진행률 표시 (완료 순서 기준)
+            completed += 1
+            print_progress(completed, pages_to_fetch, f"페이지 {page_num}")
+            return data_items
+        
+        # 모든 페이지 동시 처리 (결과는 페이지 순서대로 반환됨)
+        tasks = [fetch_page(page_num) for page_num in range(1, pages_to_fetch + 1)]
+        try:
+            page_results = await asyncio.gather(*tasks)
+        finally:
+            if ndjson_file is not None:
+                ndjson_file.close()
+        
+        for page_num, data_items in enumerate(page_results, start=1):
             if data_items:
                 logging.debug(f"페이지 {page_num}에서 {len(data_items)}개 항목 발견")
                 all_items.extend(data_items)
             else:
                 logging.warning(f"페이지 {page_num}에서 데이터를 찾을 수 없습니다.")
-            
-            # 과도한 요청 방지를 위한 딜레이
-            await asyncio.sleep(random.uniform(0.5, 1.0))
         
         print("\n")  # 진행률 표시 후 줄바꿈
         
@@ -208,10 +345,24 @@ async def collect_list_data(keyword, max_pages=0):
         
         logging.info(f"총 {len(all_items)}개 항목을 수집했습니다.")
         
-        # 메타데이터 저장
-        if all_items:
-            metadata_file = "data_list.json"  # 목록화 결과 저장 파일
-            save_metadata(all_items, metadata_file)
-            logging.info(f"모든 목록 데이터가 '{metadata_file}'에 저장되었습니다.")
+        # 메타데이터 저장 (NDJSON은 수집 중에 이미 기록됨)
+        if ndjson_file is None:
+            await asyncio.to_thread(save_metadata, all_items, metadata_file)
+        logging.info(f"모든 목록 데이터가 '{metadata_file}'에 저장되었습니다.")
         
-        return all_items 
\ No newline at end of file
+        return all_items
+
+# 다음 단계와 동시에 실행되는 목록화 함수
+async def stream_list_data(item_queue, keyword, max_pages=0, rate=None, extra_params=None, output_format='json', concurrency=None, limiter=None, semaphore=None):
+    """목록을 수집하면서 항목을 페이지 순서대로 item_queue에 넘기는 함수
+    
+    수집이 끝나거나 실패하면 None을 넣어 입력 종료를 알립니다. 나머지 인수와 반환값은 collect_list_data와 동일합니다.
+    """
+    try:
+        return await collect_list_data(
+            keyword, max_pages, rate=rate, extra_params=extra_params, output_format=output_format,
+            concurrency=concurrency, item_queue=item_queue,
+            limiter=limiter, semaphore=semaphore
+        )
+    finally:
+        item_queue.put_nowait(None)
@@ -6,8 +6,10 @@ import asyncio
 import argparse
 import logging
 import os
-from .config import LOG_LEVEL, LOG_FORMAT, DOWNLOAD_BASE_DIR
-from .utils import setup_logger, print_summary
+import sys
+import time
+from .config import LOG_LEVEL, LOG_FORMAT, DOWNLOAD_BASE_DIR, STAGE_CACHE_TTL, LIST_CONCURRENCY, DETAIL_CONCURRENCY
+from .utils import setup_logger, print_summary, create_rate_limiter, load_metadata, stage_cache_key, save_stage_cache, is_stage_cache_valid
 
 # 모듈 임포트
 from . import list_crawler
@@ -15,8 +17,25 @@ from . import detail_crawler
 from . import downloader
 from . import uploader
 
-def parse_arguments():
-    """명령행 인수 파싱 함수"""
+def parse_search_param(value):
+    """KEY=VALUE 형식의 검색 파라미터를 (키, 값) 튜플로 변환하는 함수"""
+    key, sep, param_value = value.partition('=')
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"KEY=VALUE 형식이어야 합니다: {value}")
+    return key, param_value
+
+def parse_positive_int(value):
+    """1 이상의 정수 인수를 변환하는 함수"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"정수여야 합니다: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1 이상이어야 합니다: {value}")
+    return number
+
+def _build_parser():
+    """명령행 인수 파서 생성 함수"""
     parser = argparse.ArgumentParser(description='공공데이터포털 전라북도 데이터 수집/다운로드/업로드 도구')
     
     # 모드 선택
@@ -30,6 +49,9 @@ def parse_arguments():
     parser.add_argument('-p', '--pages', type=int, default=1,
                         help='처리할 최대 페이지 수 (기본값: 1, 0 입력 시 모든 페이지 탐색)')
     
+    parser.add_argument('--search-param', nargs='+', type=parse_search_param, metavar='KEY=VALUE',
+                        help='목록 검색 요청에 추가할 서버 측 필터 파라미터 (예: orgFullName=전북특별자치도)')
+    
     # 필터링 및 다운로드 옵션
     parser.add_argument('-n', '--num-process', type=int, default=2,
                         help='처리할 최대 항목 수 (세부페이지/다운로드) (기본값: 2, 0 입력 시 모든 항목 처리)')
@@ -37,12 +59,27 @@ def parse_arguments():
     parser.add_argument('--data-ids', nargs='+',
                         help='처리/다운로드/업로드할 데이터 ID 목록')
     
+    parser.add_argument('--rate', type=float,
+                        help='초당 최대 요청 수 (목록/세부정보/다운로드) (기본값: config의 REQUEST_RATE)')
+    
+    parser.add_argument('--max-concurrency', type=parse_positive_int,
+                        help='단계별 최대 동시 요청 수 (목록/세부정보/다운로드/업로드) (기본값: config의 단계별 *_CONCURRENCY)')
+    
     # 파일 경로 옵션
-    parser.add_argument('--list-file', default='data_list.json',
-                        help='목록 데이터 파일 경로 (세부정보 수집 모드에서 사용)')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json',
+                        help='목록/세부정보 저장 형식 (json: 종료 시 한 번에 저장, ndjson: 줄 단위로 이어 쓰기) (기본값: json)')
+    
+    parser.add_argument('--list-file',
+                        help='목록 데이터 파일 경로 (세부정보 수집 모드에서 사용) (기본값: data_list.<format>)')
     
-    parser.add_argument('--detail-file', default='data_detail.json',
-                        help='상세정보 데이터 파일 경로 (다운로드 모드에서 사용)')
+    parser.add_argument('--detail-file',
+                        help='상세정보 데이터 파일 경로 (다운로드 모드에서 사용) (기본값: data_detail.<format>)')
+    
+    parser.add_argument('--force-download', action='store_true',
+                        help='이미 다운로드된 항목도 다시 다운로드 (기본값: metadata.json이 있는 항목은 건너뜀)')
+    
+    parser.add_argument('--refresh', action='store_true',
+                        help='최근 결과를 재사용하지 않고 목록/세부정보를 다시 수집 (기본값: 같은 조건으로 1시간 이내에 만든 결과는 재사용)')
     
     parser.add_argument('--results-file', default='download_results.json',
                         help='다운로드 결과 파일 경로 (업로드 모드에서 사용)')
@@ -61,7 +98,87 @@ def parse_arguments():
     parser.add_argument('--debug-html-dir', type=str, default='debug_html',
                         help='HTML 파일 저장 디렉토리 (기본값: debug_html)')
     
-    return parser.parse_args()
+    return parser
+
+# 파서는 모듈 로드 시 한 번만 만들어 재사용 (main을 반복 호출해도 다시 구성하지 않음)
+_PARSER = _build_parser()
+
+def parse_arguments():
+    """명령행 인수 파싱 함수"""
+    args = _PARSER.parse_args()
+    
+    # 파일 경로를 지정하지 않으면 저장 형식에 맞는 기본 파일 사용
+    args.list_file = args.list_file or f"data_list.{args.format}"
+    args.detail_file = args.detail_file or f"data_detail.{args.format}"
+    
+    return args
+
+# 이미 확인한 디렉토리 (main을 반복 호출할 때 같은 디렉토리를 다시 검사하지 않음)
+_ensured_dirs = set()
+
+def _ensure_dir(path):
+    """디렉토리가 없으면 생성하고, 한 번 확인한 경로는 다시 검사하지 않는 함수"""
+    if path in _ensured_dirs:
+        return
+    if not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
+    _ensured_dirs.add(path)
+
+def _format_elapsed(start):
+    """time.monotonic() 기준 시작 시각부터 지난 시간을 'N분 N초' 형식으로 반환하는 함수"""
+    minutes, seconds = divmod(time.monotonic() - start, 60)
+    return f"{int(minutes)}분 {int(seconds)}초"
+
+def _stage_cache_target(args):
+    """모드별로 재사용 여부를 판단할 결과 파일과 실행 조건 캐시 키를 반환하는 함수 (대상이 없으면 None)"""
+    search_params = sorted(args.search_param) if args.search_param else None
+    if args.mode == 'list':
+        return f"data_list.{args.format}", stage_cache_key('list', args.keyword, args.pages, search_params)
+    if args.mode == 'all':
+        return f"data_detail.{args.format}", stage_cache_key('all', args.keyword, args.pages, search_params, args.num_process)
+    if args.mode == 'detail' and os.path.exists(args.list_file):
+        # 목록 파일이 바뀌면 수정 시각이 달라지므로 다시 수집
+        list_file = os.path.abspath(args.list_file)
+        return f"data_detail.{args.format}", stage_cache_key('detail', list_file, os.path.getmtime(list_file), args.num_process)
+    return None
+
+async def _run_upload(args, logger, mode_label):
+    """다운로드 디렉토리의 폴더를 업로드하고 결과를 요약하는 함수 (upload/quick_upload/all 모드 공통)
+    
+    Args:
+        args: 명령행 인수
+        logger: 로거
+        mode_label: 로그와 결과 요약에 표시할 작업 이름 (예: '데이터 업로드')
+    """
+    # 이전 upload_source 옵션은 무시하고 항상 디렉토리 기반 업로드 사용
+    if args.retry_failed:
+        logger.info(f"{mode_label} 모드 (실패 항목 재시도)를 시작합니다.")
+    else:
+        logger.info(f"{mode_label} 모드를 시작합니다. 다운로드 디렉토리의 모든 폴더를 업로드합니다.")
+    
+    # 시작 시간 기록
+    start_time = time.monotonic()
+    
+    # 디렉토리 기반 업로드 (모든 폴더)
+    uploaded, failed = await uploader.upload_from_directory(
+        selected_ids=args.data_ids,
+        custom_filename=args.custom_filename,
+        retry_failed=args.retry_failed,
+        concurrency=args.max_concurrency
+    )
+    
+    # 결과 요약
+    print_summary(
+        f"{mode_label} (소요시간: {_format_elapsed(start_time)})", 
+        len(uploaded), 
+        len(failed)
+    )
+    
+    # 실패 항목이 있으면 재시도 방법 안내 (all 모드는 upload 모드로 재시도)
+    if failed:
+        retry_mode = 'quick_upload' if args.mode == 'quick_upload' else 'upload'
+        logger.info(f"실패한 {len(failed)}개 항목이 있습니다. 재시도하려면 --retry-failed 옵션을 사용하세요.")
+        logger.info(f"명령어 예시: python run.py --mode {retry_mode} --retry-failed")
 
 async def main():
     """메인 함수"""
@@ -74,77 +191,97 @@ async def main():
     
     # 디버그 모드 설정이 활성화되면 HTML 저장 디렉토리 생성
     if args.debug and args.debug_html_dir:
-        os.makedirs(args.debug_html_dir, exist_ok=True)
+        _ensure_dir(args.debug_html_dir)
         logger.info(f"디버그 HTML 파일 저장 디렉토리: {args.debug_html_dir}")
     
     # 다운로드 디렉토리 생성
-    os.makedirs(DOWNLOAD_BASE_DIR, exist_ok=True)
+    _ensure_dir(DOWNLOAD_BASE_DIR)
     
     # 빠른 업로드 모드 - 다운로드 디렉토리의 모든 폴더를 즉시 업로드
     if args.mode == 'quick_upload':
-        if args.retry_failed:
-            logger.info("빠른 업로드 모드 (실패 항목 재시도)를 시작합니다.")
-        else:
-            logger.info("빠른 업로드 모드를 시작합니다. 다운로드 디렉토리의 모든 폴더를 업로드합니다.")
-        
-        # 시작 시간 기록
-        import time
-        start_time = time.time()
-        
-        # 디렉토리 기반 업로드 (모든 폴더)
-        uploaded, failed = await uploader.upload_from_directory(
-            selected_ids=args.data_ids,
-            custom_filename=args.custom_filename,
-            retry_failed=args.retry_failed
-        )
-        
-        # 소요 시간 계산
-        elapsed_time = time.time() - start_time
-        minutes, seconds = divmod(elapsed_time, 60)
-        time_str = f"{int(minutes)}분 {int(seconds)}초"
-        
-        # 결과 요약
-        print_summary(
-            f"빠른 데이터 업로드 (소요시간: {time_str})", 
-            len(uploaded), 
-            len(failed)
-        )
-        
-        # 실패 항목이 있으면 재시도 방법 안내
-        if failed:
-            logger.info(f"실패한 {len(failed)}개 항목이 있습니다. 재시도하려면 --retry-failed 옵션을 사용하세요.")
-            logger.info("명령어 예시: python run.py --mode quick_upload --retry-failed")
-        
+        await _run_upload(args, logger, "빠른 데이터 업로드")
         logger.info("빠른 업로드 작업이 완료되었습니다.")
         return
     
+    # 같은 조건으로 최근에 만든 목록/세부정보 결과가 있으면 다시 수집하지 않고 재사용
+    cached_items = None
+    cache_target = _stage_cache_target(args)
+    if cache_target and not args.refresh and is_stage_cache_valid(*cache_target, STAGE_CACHE_TTL):
+        cached_items = await asyncio.to_thread(load_metadata, cache_target[0])
+        if cached_items is not None:
+            logger.info(f"같은 조건으로 만든 최근 결과를 재사용합니다: {cache_target[0]} (다시 수집하려면 --refresh 옵션 사용)")
+    
     # 기존 모드에 따른 처리
-    if args.mode in ['list', 'all']:
+    detail_task = None  # 전체 과정에서 목록화와 함께 실행되는 세부정보 수집 태스크
+    if args.mode in ['list', 'all'] and cached_items is None:
         # 목록화 모드
         logger.info("데이터 목록화 모드를 시작합니다.")
-        collected_items = await list_crawler.collect_list_data(
+        list_options = dict(
             keyword=args.keyword,
-            max_pages=args.pages
+            max_pages=args.pages,
+            rate=args.rate,
+            extra_params=dict(args.search_param) if args.search_param else None,
+            output_format=args.format,
+            concurrency=args.max_concurrency
         )
         
+        if args.mode == 'all':
+            # 목록 페이지가 끝나는 대로 큐로 넘겨 세부정보 수집을 목록화와 겹쳐 실행
+            # (목록 파일에는 전체 항목을 저장하고, 제목/제공기관 필터는 큐를 받는 세부정보 단계에서 적용)
+            logger.info("데이터 세부정보 수집 및 필터링을 목록화와 함께 진행합니다.")
+            item_queue = asyncio.Queue()
+            # 두 단계가 같은 서버에 동시에 요청하므로 속도 제한과 동시 요청 제한을 하나로 공유 (--rate, --max-concurrency가 전체 요청에 적용)
+            shared_limits = dict(
+                limiter=create_rate_limiter(args.rate),
+                semaphore=asyncio.Semaphore(args.max_concurrency or max(LIST_CONCURRENCY, DETAIL_CONCURRENCY))
+            )
+            async with asyncio.TaskGroup() as tg:
+                list_task = tg.create_task(list_crawler.stream_list_data(item_queue, **list_options, **shared_limits))
+                detail_task = tg.create_task(detail_crawler.stream_detail_data(
+                    item_queue,
+                    limit=args.num_process,
+                    debug=args.debug,
+                    debug_html_dir=args.debug_html_dir,
+                    rate=args.rate,
+                    output_format=args.format,
+                    **shared_limits
+                ))
+            collected_items = list_task.result()
+        else:
+            collected_items = await list_crawler.collect_list_data(**list_options)
+        
         if not collected_items:
             logger.error("수집된 데이터가 없습니다. 프로세스를 종료합니다.")
             return
             
         logger.info(f"총 {len(collected_items)}개 항목이 목록화되었습니다.")
         print_summary("데이터 목록화", len(collected_items), 0)
+        
+        if args.mode == 'list':
+            await asyncio.to_thread(save_stage_cache, *cache_target)
+    elif args.mode == 'list':
+        print_summary("데이터 목록화 (최근 결과 재사용)", len(cached_items), 0)
     
     if args.mode in ['detail', 'all']:
-        # 세부정보 수집 모드
-        logger.info("데이터 세부정보 수집 및 필터링 모드를 시작합니다.")
-        
-        # 세부정보 수집 및 필터링 실행 (디버그 옵션 전달)
-        filtered_items = await detail_crawler.collect_detail_data(
-            list_file=args.list_file,
-            limit=args.num_process,
-            debug=args.debug,
-            debug_html_dir=args.debug_html_dir
-        )
+        if cached_items is not None:
+            filtered_items = cached_items
+        elif detail_task is not None:
+            # 전체 과정에서는 목록화와 함께 이미 수집됨
+            filtered_items = detail_task.result()
+        else:
+            # 세부정보 수집 모드
+            logger.info("데이터 세부정보 수집 및 필터링 모드를 시작합니다.")
+            
+            # 세부정보 수집 및 필터링 실행 (디버그 옵션 전달)
+            filtered_items = await detail_crawler.collect_detail_data(
+                list_file=args.list_file,
+                limit=args.num_process,
+                debug=args.debug,
+                debug_html_dir=args.debug_html_dir,
+                rate=args.rate,
+                output_format=args.format,
+                concurrency=args.max_concurrency
+            )
         
         if not filtered_items:
             logger.error("세부정보 수집 및 필터링 후 남은 데이터가 없습니다. 프로세스를 종료합니다.")
@@ -154,9 +291,13 @@ async def main():
             logger.info(f"총 {len(filtered_items)}개 항목이 세부정보 수집 및 필터링되었습니다.")
             print_summary("데이터 세부정보 수집", len(filtered_items), 0)
             
-            # all 모드에서 다음 단계로 파일 경로 전달 (data_detail.json 파일 경로 저장)
+            # 새로 수집한 결과 파일에 실행 조건 기록 (다음 실행에서 재사용 여부 판단)
+            if cached_items is None and cache_target:
+                await asyncio.to_thread(save_stage_cache, *cache_target)
+            
+            # all 모드에서 다음 단계로 파일 경로 전달 (data_detail.<format> 파일 경로 저장)
             if args.mode == 'all':
-                args.detail_file = "data_detail.json"
+                args.detail_file = f"data_detail.{args.format}"
                 logger.info(f"다운로드 단계에서 사용할 세부정보 데이터 파일: {args.detail_file}")
     
     if args.mode in ['download', 'all']:
@@ -167,7 +308,10 @@ async def main():
         downloaded, failed, skipped = await downloader.download_filtered_data(
             filtered_file=args.detail_file,
             num_downloads=args.num_process,
-            selected_ids=args.data_ids
+            selected_ids=args.data_ids,
+            rate=args.rate,
+            concurrency=args.max_concurrency,
+            force=args.force_download
         )
         
         # 결과 요약
@@ -181,43 +325,23 @@ async def main():
     
     if args.mode in ['upload', 'all']:
         # 업로드 모드 (모두 quick_upload 방식으로 변경)
-        logger.info("데이터 업로드 모드를 시작합니다.")
-        
-        # 시작 시간 기록
-        import time
-        start_time = time.time()
-        
-        # 이전 upload_source 옵션은 무시하고 항상 디렉토리 기반 업로드 사용
-        if args.retry_failed:
-            logger.info("업로드 모드 (실패 항목 재시도)를 시작합니다.")
-        else:
-            logger.info("업로드 모드를 시작합니다. 다운로드 디렉토리의 모든 폴더를 업로드합니다.")
-        
-        # 디렉토리 기반 업로드 (모든 폴더) - quick_upload와 동일한 방식
-        uploaded, failed = await uploader.upload_from_directory(
-            selected_ids=args.data_ids,
-            custom_filename=args.custom_filename,
-            retry_failed=args.retry_failed
-        )
-        
-        # 소요 시간 계산
-        elapsed_time = time.time() - start_time
-        minutes, seconds = divmod(elapsed_time, 60)
-        time_str = f"{int(minutes)}분 {int(seconds)}초"
-        
-        # 결과 요약
-        print_summary(
-            f"데이터 업로드 (소요시간: {time_str})", 
-            len(uploaded), 
-            len(failed)
-        )
-        
-        # 실패 항목이 있으면 재시도 방법 안내
-        if failed:
-            logger.info(f"실패한 {len(failed)}개 항목이 있습니다. 재시도하려면 --retry-failed 옵션을 사용하세요.")
-            logger.info("명령어 예시: python run.py --mode upload --retry-failed")
+        await _run_upload(args, logger, "데이터 업로드")
     
     logger.info("모든 작업이 완료되었습니다.")
 
+# 이벤트 루프 생성 함수 (uvloop는 Windows를 지원하지 않으므로 그 외 플랫폼에서만 사용)
+if sys.platform != 'win32':
+    import uvloop
+    _loop_factory = uvloop.new_event_loop
+else:
+    _loop_factory = None
+
+def run():
+    """이벤트 루프를 만들어 메인 함수를 실행하는 함수"""
+    with asyncio.Runner(loop_factory=_loop_factory) as runner:
+        # 대기 없이 끝나는 태스크는 스케줄러를 거치지 않고 즉시 실행 (Python 3.12+)
+        runner.get_loop().set_task_factory(asyncio.eager_task_factory)
+        runner.run(main())
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run() 
\ No newline at end of file
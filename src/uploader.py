@@ -12,7 +12,7 @@ import requests
 import functools
 from urllib.parse import urljoin, unquote, quote
 
-from .config import FILE_SERVER, DOWNLOAD_BASE_DIR
+from .config import FILE_SERVER, DOWNLOAD_BASE_DIR, UPLOAD_CONCURRENCY
 from .utils import print_progress, save_metadata, load_metadata
 
 # 업로드 결과 저장 파일
@@ -424,13 +424,14 @@ async def upload_item(data_dir, custom_filename=None):
 #         return uploaded, failed
 
 # 디렉토리 기반 업로드
-async def upload_from_directory(selected_ids=None, custom_filename=None, retry_failed=False):
+async def upload_from_directory(selected_ids=None, custom_filename=None, retry_failed=False, concurrency=None):
     """다운로드 디렉토리에서 직접 항목들을 업로드하는 함수 (requests 사용)
     
     Args:
         selected_ids: 선택적으로 업로드할 데이터 ID 목록
         custom_filename: 업로드 시 사용할 커스텀 파일명 (None인 경우 원본 파일명 사용)
         retry_failed: 이전에 실패한 항목 재시도 여부
+        concurrency: 동시에 업로드할 항목 수 (None일 경우 UPLOAD_CONCURRENCY)
     """
     # 다운로드 디렉토리 내 모든 하위 디렉토리 확인
     if not os.path.exists(DOWNLOAD_BASE_DIR):
@@ -490,7 +491,7 @@ async def upload_from_directory(selected_ids=None, custom_filename=None, retry_f
     format_mismatch = []  # 형식 불일치 항목
     
     # 병렬 업로드를 위한 세마포어 (동시 요청 제한)
-    semaphore = asyncio.Semaphore(3)  # 최대 3개 동시 업로드
+    semaphore = asyncio.Semaphore(concurrency or UPLOAD_CONCURRENCY)
     
     # 각 디렉토리 처리를 위한 태스크 생성
     async def process_directory(idx, dir_path):
@@ -3,11 +3,19 @@
 """
 
 import os
+import sys
+import codecs
+import hashlib
 import logging
-import json
+import ijson
+import orjson
 import re
 import time
-from .config import PROGRESS_BAR_WIDTH
+import socket
+import aiohttp
+from aiolimiter import AsyncLimiter
+from lxml import etree, html as lxml_html
+from .config import PROGRESS_BAR_WIDTH, HTTP_CONNECTOR, HTTP_TIMEOUT, REQUEST_RATE
 
 # 로깅 설정
 def setup_logger(level=logging.INFO, log_format=None):
@@ -18,9 +26,82 @@ def setup_logger(level=logging.INFO, log_format=None):
     logging.basicConfig(level=level, format=log_format)
     return logging.getLogger()
 
+# 소켓 생성 함수 (aiohttp TCPConnector의 socket_factory)
+def _create_socket(addr_info):
+    """Nagle 알고리즘과 지연 ACK를 끈 TCP 소켓을 생성하는 함수
+    
+    작은 JSON API 응답(파일 정보 조회 등)에서 발생하는 약 40ms의 지연을 방지합니다.
+    """
+    family, sock_type, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=sock_type, proto=proto)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # TCP_QUICKACK은 리눅스에서만 지원
+    if hasattr(socket, 'TCP_QUICKACK'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    return sock
+
+# HTTP 세션 생성 함수
+def create_session(headers=None):
+    """연결 풀과 타임아웃이 설정된 aiohttp 세션을 생성하는 함수
+    
+    Args:
+        headers: 세션 기본 요청 헤더
+    
+    Returns:
+        aiohttp.ClientSession: keep-alive 연결을 재사용하는 세션
+    """
+    connector = aiohttp.TCPConnector(socket_factory=_create_socket, **HTTP_CONNECTOR)
+    timeout = aiohttp.ClientTimeout(**HTTP_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers)
+
+# 요청 속도 제한 함수
+def create_rate_limiter(rate=None):
+    """초당 요청 수를 제한하는 토큰 버킷을 생성하는 함수
+    
+    Args:
+        rate: 초당 최대 요청 수 (None이면 config의 REQUEST_RATE 사용)
+    
+    Returns:
+        AsyncLimiter: 여러 태스크가 공유하는 속도 제한기
+    """
+    return AsyncLimiter(rate or REQUEST_RATE, 1.0)
+
+# XPath 클래스 조건 생성 (CSS의 .class 선택자와 동일)
+def xpath_class(class_name):
+    """요소의 class 속성에 지정한 클래스가 포함되는지 검사하는 XPath 조건식"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+# 표시되는 텍스트 노드 (스크립트/스타일 내용 제외)
+_XP_VISIBLE_TEXT = etree.XPath('.//text()[not(parent::script or parent::style or parent::template)]')
+
+# 요소 텍스트 추출 (공백을 제거한 텍스트 조각을 이어 붙임)
+def element_text(element):
+    """요소 하위의 모든 텍스트 조각을 공백 제거 후 이어 붙이는 함수"""
+    return ''.join(text.strip() for text in _XP_VISIBLE_TEXT(element))
+
+# 인코딩별 lxml HTML 파서 (프로세스마다 한 번만 생성)
+_HTML_PARSERS = {}
+
+def get_html_parser(encoding):
+    """지정한 인코딩으로 바이트를 해석하는 lxml HTML 파서를 반환하는 함수"""
+    parser = _HTML_PARSERS.get(encoding)
+    if parser is None:
+        parser = _HTML_PARSERS[encoding] = lxml_html.HTMLParser(encoding=encoding)
+    return parser
+
+# 진행률 표시 최소 간격 (초) 및 마지막 표시 시각
+_PROGRESS_INTERVAL = 0.05
+_last_progress_time = 0.0
+
 # 진행률 표시 함수
 def print_progress(current, total, title='', success=None):
-    """진행률을 시각적으로 표시하는 함수"""
+    """진행률을 시각적으로 표시하는 함수 (최소 간격보다 잦은 갱신은 생략, 완료 상태는 항상 표시)"""
+    global _last_progress_time
+    now = time.monotonic()
+    if current != total and now - _last_progress_time < _PROGRESS_INTERVAL:
+        return
+    _last_progress_time = now
+    
     percent = int(100 * current / total)
     filled_width = int(PROGRESS_BAR_WIDTH * current / total)
     bar = '■' * filled_width + '□' * (PROGRESS_BAR_WIDTH - filled_width)
@@ -38,86 +119,185 @@ def print_progress(current, total, title='', success=None):
         title_display = ""
     
     progress_text = f"\r진행률: [{bar}] {percent}% ({current}/{total}){title_display} {status}"
-    print(progress_text, end='', flush=True)
     
     # 완료되면 줄바꿈
     if current == total:
-        print()
+        progress_text += "\n"
+    
+    sys.stdout.write(progress_text)
+    sys.stdout.flush()
+
+# 파일명 정리용 변환 테이블 및 정규식 (모듈 로드 시 한 번만 생성)
+_FILENAME_BAD_CHARS_TABLE = str.maketrans(dict.fromkeys('\\/*?:"<>|,', '_'))  # Windows 파일명 금지 문자
+_REPEATED_UNDERSCORE_RE = re.compile(r'_+')
+_REPEATED_SPACE_RE = re.compile(r'\s+')
 
 # 파일명 정리 함수
 def sanitize_filename(filename):
     """파일명에서 금지된 문자를 제거하고 정리하는 함수"""
     # 파일명에 금지된 문자 제거 (Windows 파일명으로 사용할 수 없는 문자들)
-    filename = re.sub(r'[\\/*?:"<>|,]', '_', filename)
+    filename = filename.translate(_FILENAME_BAD_CHARS_TABLE)
     # 연속된 언더스코어 제거 및 공백 정리
-    filename = re.sub(r'_+', '_', filename)  # 연속된 언더스코어를 하나로
-    filename = re.sub(r'\s+', ' ', filename)  # 연속된 공백을 하나로
+    filename = _REPEATED_UNDERSCORE_RE.sub('_', filename)  # 연속된 언더스코어를 하나로
+    filename = _REPEATED_SPACE_RE.sub(' ', filename)  # 연속된 공백을 하나로
     return filename.strip()
 
+# 인코딩 변환 시 한 번에 읽을 크기 (바이트)
+_ENCODING_CHUNK_SIZE = 1 << 20
+
+# 인코딩 검사 함수
+def _is_valid_encoding(file_path, encoding):
+    """파일 전체가 지정한 인코딩으로 디코딩 가능한지 청크 단위로 확인하는 함수"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_ENCODING_CHUNK_SIZE), b''):
+                decoder.decode(chunk)
+            decoder.decode(b'', final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+# 스트리밍 인코딩 변환 함수
+def _transcode_file(src_path, dst_path, from_encoding, to_encoding):
+    """파일을 청크 단위로 디코딩/인코딩하여 새 파일에 저장하는 함수 (멀티바이트 경계 처리 포함)"""
+    decoder = codecs.getincrementaldecoder(from_encoding)()
+    encoder = codecs.getincrementalencoder(to_encoding)()
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        for chunk in iter(lambda: src.read(_ENCODING_CHUNK_SIZE), b''):
+            dst.write(encoder.encode(decoder.decode(chunk)))
+        dst.write(encoder.encode(decoder.decode(b'', final=True), final=True))
+
 # 인코딩 변환 함수
 def convert_encoding(file_path, from_encoding='euc-kr', to_encoding='utf-8'):
-    """파일의 인코딩을 변환하는 함수"""
+    """파일의 인코딩을 변환하는 함수 (파일 전체를 메모리에 올리지 않고 스트리밍 처리)"""
+    temp_path = f"{file_path}.tmp"
     try:
-        # 원본 파일 내용 읽기
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        # 먼저 원래 인코딩으로 디코딩 시도
-        try:
-            decoded_content = content.decode(from_encoding)
-            
-            # 새 인코딩으로 저장
-            with open(file_path, 'w', encoding=to_encoding) as f:
-                f.write(decoded_content)
-            
-            logging.debug(f"파일 인코딩 변환 성공: {file_path} ({from_encoding} -> {to_encoding})")
+        # 이미 대상 인코딩이면 변환 생략
+        if _is_valid_encoding(file_path, to_encoding):
+            logging.debug(f"파일이 이미 {to_encoding} 인코딩입니다: {file_path}")
             return True
-        except UnicodeDecodeError:
-            # 다른 인코딩 시도
+        
+        # 원래 인코딩으로 시도 후 CP949도 시도 (EUC-KR은 CP949의 부분집합이므로 CP949로 한 번만 시도)
+        if codecs.lookup(from_encoding).name in ('euc_kr', 'cp949'):
+            candidates = ['cp949']
+        else:
+            candidates = [from_encoding, 'cp949']
+        for encoding in candidates:
             try:
-                decoded_content = content.decode('cp949')  # CP949도 시도
-                
-                # 새 인코딩으로 저장
-                with open(file_path, 'w', encoding=to_encoding) as f:
-                    f.write(decoded_content)
-                
-                logging.debug(f"파일 인코딩 변환 성공: {file_path} (cp949 -> {to_encoding})")
-                return True
+                _transcode_file(file_path, temp_path, encoding, to_encoding)
             except UnicodeDecodeError:
-                logging.warning(f"인코딩 변환 실패: {file_path}. 파일이 예상된 인코딩이 아닙니다.")
-                return False
+                continue
+            
+            # 변환이 끝난 파일로 원본 교체
+            os.replace(temp_path, file_path)
+            logging.debug(f"파일 인코딩 변환 성공: {file_path} ({encoding} -> {to_encoding})")
+            return True
+        
+        logging.warning(f"인코딩 변환 실패: {file_path}. 파일이 예상된 인코딩이 아닙니다.")
+        return False
     
     except Exception as e:
         logging.error(f"인코딩 변환 오류: {str(e)}")
         return False
+    finally:
+        # 변환 실패 시 남은 임시 파일 정리
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# NDJSON 기록 함수
+def write_ndjson(f, items):
+    """항목 목록을 한 줄에 하나씩 JSON으로 기록하는 함수 (바이너리 모드 파일 객체)"""
+    f.write(b''.join(orjson.dumps(item, option=orjson.OPT_NON_STR_KEYS) + b'\n' for item in items))
 
 # 메타데이터 저장 함수
 def save_metadata(data, file_path):
-    """메타데이터를 파일로 저장하는 함수"""
+    """메타데이터를 파일로 저장하는 함수 (.ndjson 확장자는 줄 단위 JSON으로 저장)
+    
+    임시 파일에 모두 쓴 뒤 교체하므로 저장 중 중단되어도 기존 파일이 깨지지 않습니다.
+    """
+    temp_path = f"{file_path}.tmp"
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(temp_path, 'wb') as f:
+            if file_path.endswith('.ndjson'):
+                write_ndjson(f, data)
+            else:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(temp_path, file_path)
         return True
     except Exception as e:
         logging.error(f"메타데이터 저장 오류: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
         return False
 
 # 메타데이터 로드 함수
 def load_metadata(file_path):
-    """메타데이터 파일을 로드하는 함수"""
+    """메타데이터 파일을 로드하는 함수 (.ndjson 확장자는 줄 단위 JSON으로 로드)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            if file_path.endswith('.ndjson'):
+                return [orjson.loads(line) for line in f if line.strip()]
+            return orjson.loads(f.read())
     except Exception as e:
         logging.error(f"메타데이터 로드 오류: {str(e)}")
         return None
 
+# 메타데이터 항목 스트리밍 로드 함수
+def iter_metadata_items(file_path):
+    """목록형 메타데이터 파일의 항목을 하나씩 읽어 반환하는 제너레이터 (파일 전체를 메모리에 올리지 않음)
+    
+    .ndjson은 줄 단위로, .json은 최상위 배열의 원소를 ijson으로 스트리밍 파싱합니다.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if file_path.endswith('.ndjson'):
+                for line in f:
+                    if line.strip():
+                        yield orjson.loads(line)
+            else:
+                yield from ijson.items(f, 'item', use_float=True)
+    except Exception as e:
+        logging.error(f"메타데이터 로드 오류: {str(e)}")
+
+# 단계 결과 캐시 함수
+def stage_cache_key(*parts):
+    """실행 조건(키워드, 페이지 수 등)으로 단계 결과 캐시 키를 만드는 함수"""
+    return hashlib.blake2b('|'.join(map(str, parts)).encode(), digest_size=8).hexdigest()
+
+def _stage_cache_path(file_path):
+    """결과 파일 옆에 두는 캐시 정보 파일 경로"""
+    return f"{file_path}.cache"
+
+def save_stage_cache(file_path, cache_key):
+    """결과 파일을 만든 실행 조건과 그때의 수정 시각을 캐시 정보 파일에 기록하는 함수"""
+    try:
+        info = {'cache_key': cache_key, 'mtime': os.path.getmtime(file_path)}
+        with open(_stage_cache_path(file_path), 'wb') as f:
+            f.write(orjson.dumps(info))
+        return True
+    except Exception as e:
+        logging.error(f"캐시 정보 저장 오류: {str(e)}")
+        return False
+
+def is_stage_cache_valid(file_path, cache_key, ttl):
+    """결과 파일이 같은 조건으로 만들어졌고 이후 바뀌지 않았으며 유효 시간 이내인지 확인하는 함수
+    
+    다른 모드나 조건으로 파일을 다시 쓰면 수정 시각이 달라지므로 캐시가 자동으로 무효화됩니다.
+    """
+    try:
+        with open(_stage_cache_path(file_path), 'rb') as f:
+            info = orjson.loads(f.read())
+        mtime = os.path.getmtime(file_path)
+    except (OSError, orjson.JSONDecodeError):
+        return False
+    return info.get('cache_key') == cache_key and info.get('mtime') == mtime and time.time() - mtime < ttl
+
 # 실패 목록 기록 함수
-def record_failed_item(file_path, title, reason):
-    """실패한 항목을 파일에 기록하는 함수"""
+def record_failed_item(failed_file, title, reason):
+    """실패한 항목을 열려 있는 실패 목록 파일에 한 줄로 기록하는 함수"""
     try:
-        with open(file_path, 'a', encoding='utf-8') as f:
-            f.write(f"{title}: {reason}\n")
+        failed_file.write(f"{title}: {reason}\n")
         return True
     except Exception as e:
         logging.error(f"실패 항목 기록 오류: {str(e)}")
@@ -45,5 +45,5 @@ try:
 except requests.exceptions.RequestException as e:
     print(f"업로드 중 오류 발생: {e}")
 
-print("\n업로드 시도 완료. Flask 서버(server.py)의 로그를 확인하여 파일명이 어떻게 기록되었는지 확인하세요.")
+print("\n업로드 시도 완료. 업로드 서버(server.py)의 로그를 확인하여 파일명이 어떻게 기록되었는지 확인하세요.")
 print(f"특히 '수신된 원본 파일명'이 '{file_name_korean}'으로 나오는지, 아니면 URL 인코딩된 형태로 나오는지 주목하세요.") 
\ No newline at end of file